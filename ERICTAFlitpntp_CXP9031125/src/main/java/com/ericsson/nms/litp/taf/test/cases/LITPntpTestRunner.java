@@ -1,5 +1,7 @@
 package com.ericsson.nms.litp.taf.test.cases;
 
+import java.util.ArrayList;
+import java.util.Arrays;
 import java.util.List;
 import java.util.Map;
 import java.io.*;
@@ -10,6 +12,7 @@ import org.testng.annotations.Test;
 
 import com.ericsson.cifwk.taf.*;
 import com.ericsson.cifwk.taf.annotations.*;
+import com.ericsson.cifwk.taf.data.DataHandler;
 import com.ericsson.cifwk.taf.tools.cli.TimeoutException;
 
 import com.ericsson.nms.litp.taf.operators.RPMUpgrade;
@@ -53,13 +56,94 @@ public class LITPntpTestRunner extends TorTestCaseHelper {
      */
     @TestId(id = "CXP9031125-2", title = "Run python test cases for ERIClitpntp package")
     @Test(groups={"CDB_REGRESSION", "ACCEPTANCE"})
-    public void runERIClitpntpTests() {
+    public void runERIClitpntpTests() throws InterruptedException, IOException {
 
     	pythonTestRunnerOperator.initialise();
 
+        int shards = Integer.parseInt(attribute("ntp_shard_count", "1"));
+        if (shards > 1) {
+            if (!hasScripts()) {
+                fail("Cannot shard: ntp_scripts_dir is not set to the unpacked ntp testware");
+            }
+            String index = attribute("ntp_shard_index", "0");
+            logger.info("Running shard " + index + " of " + shards);
+            assertEquals(0, runScript("ntp_shard.py", "--shards", String.valueOf(shards),
+                    "--index", index, "--output", "ordered_tcs.txt"));
+        }
+
+        File resultsFile = NtpResultStream.resultsFile();
+        NtpResultStream resultStream = new NtpResultStream(resultsFile);
+        resultStream.start();
+        int exitCode;
+        try {
+            exitCode = pythonTestRunnerOperator.execute();
+        } finally {
+            resultStream.stop();
+            recordDurations(resultsFile);
+        }
+
+        assertEquals(0, exitCode);
+    }
+
+    /**
+     * Adds the durations of the finished cases to the duration store. A
+     * failure is only logged, so it never hides the result of the run.
+     */
+    private void recordDurations(File resultsFile) throws InterruptedException {
+        if (!hasScripts()) {
+            logger.warn("Not recording the case durations: ntp_scripts_dir is not set to the unpacked ntp testware");
+            return;
+        }
+        try {
+            if (runScript("ntp_durations.py", "record", resultsFile.getPath(),
+                    "--deployment", attribute("ntp_shard_index", "0")) != 0) {
+                logger.warn("Could not record the case durations");
+            }
+        } catch (IOException e) {
+            logger.warn("Could not record the case durations", e);
+        }
+    }
+
+    private static String attribute(String name, String defaultValue) {
+        Object value = DataHandler.getAttribute(name);
+        return value == null || value.toString().isEmpty() ? defaultValue : value.toString();
+    }
 
+    /**
+     * @return True when ntp_scripts_dir is the directory of the unpacked ntp testware
+     */
+    private static boolean hasScripts() {
+        return new File(attribute("ntp_scripts_dir", ""), "ordered_tcs.txt").isFile();
+    }
 
-        assertEquals(0, pythonTestRunnerOperator.execute());
+    /**
+     * Runs one of the python tools next to ordered_tcs.txt, with the duration
+     * store configured in ntp_durations_db.
+     *
+     * @return Exit code of the tool
+     */
+    private int runScript(String script, String... args) throws IOException, InterruptedException {
+        List<String> cmd = new ArrayList<String>();
+        cmd.add(attribute("python_executable", "python"));
+        cmd.add(script);
+        String db = attribute("ntp_durations_db", "");
+        if (!db.isEmpty()) {
+            cmd.add("--db");
+            cmd.add(db);
+        }
+        cmd.addAll(Arrays.asList(args));
+        ProcessBuilder builder = new ProcessBuilder(cmd);
+        builder.directory(new File(attribute("ntp_scripts_dir", "")));
+        builder.redirectErrorStream(true);
+        logger.info("Running " + cmd);
+        Process process = builder.start();
+        try (BufferedReader output = new BufferedReader(new InputStreamReader(process.getInputStream()))) {
+            String line;
+            while ((line = output.readLine()) != null) {
+                logger.info("    " + line);
+            }
+        }
+        return process.waitFor();
     }
 
     /**
@@ -94,4 +178,37 @@ public class LITPntpTestRunner extends TorTestCaseHelper {
             }
         }
     }
-} 
+
+    /**
+     * @DESCRIPTION Report every python test case from the results streamed during the run
+     * @PRE Execution of test {@link #runERIClitpntpTests()}
+     * @PRIORITY HIGH
+     * @param className
+     * @param name
+     * @param status
+     * @param type
+     * @param message
+     * @param text
+     */
+    @TestId(id = "CXP9031125-4", title = "Report streamed results of python tests")
+    @DataDriven(name = "ntp-results")
+    @Test(groups={"ACCEPTANCE"})
+    public void parseStreamedResults(@Input("classname") String className, @Input("name") String name,
+            @Input("status") String status, @Input("type") String type, @Input("message") String message,
+            @Input("text") String text){
+        logger.debug("TestCase:");
+        logger.debug("    classname:" + className);
+        logger.debug("    name:" + name);
+        setTestcase(className + ":" + name, "");
+        setTestInfo(name);
+        if ("failed".equals(status)) {
+            fail(type + message + text);
+        }
+        if ("error".equals(status)) {
+            throw new Error(type, message, text);
+        }
+        if ("skipped".equals(status)) {
+            throw new SkipException(message);
+        }
+    }
+}
@@ -0,0 +1,285 @@
+package com.ericsson.nms.litp.taf.test.cases;
+
+import java.io.*;
+import java.nio.charset.Charset;
+import java.util.LinkedHashMap;
+import java.util.Map;
+
+import org.apache.log4j.Logger;
+
+import com.ericsson.cifwk.taf.data.DataHandler;
+
+/**
+ * Reads the results file the python test cases append one JSON line to
+ * per finished case (see ntp_results.py).
+ *
+ * While the tests run, a background thread follows the file from the
+ * last offset it read, so every case is logged as soon as it finishes
+ * and the reader never has more than one line in memory. Once the run
+ * is over, {@link NtpResults} feeds the records one at a time to the
+ * "ntp-results" data driven test.
+ */
+public class NtpResultStream implements Runnable {
+
+    private static final Logger logger = Logger.getLogger(NtpResultStream.class);
+
+    private static final String RESULTS_FILE_PROPERTY = "ntp_results_file";
+    private static final String DEFAULT_RESULTS_FILE = "/tmp/ntp_results.jsonl";
+    private static final Charset UTF8 = Charset.forName("UTF-8");
+    private static final long POLL_MILLIS = 1000;
+
+    private final File file;
+    private Thread thread;
+    private volatile boolean stopping;
+    private long offset;
+    private int passed;
+    private int failed;
+    private int errors;
+    private int skipped;
+
+    public NtpResultStream(File file) {
+        this.file = file;
+    }
+
+    /**
+     * The default is the one ntp_results.py writes to. Any other path must
+     * also be given to the python run in NTP_RESULTS_FILE.
+     *
+     * @return The results file configured in the ntp_results_file property
+     */
+    public static File resultsFile() {
+        Object path = DataHandler.getAttribute(RESULTS_FILE_PROPERTY);
+        return new File(path == null ? DEFAULT_RESULTS_FILE : path.toString());
+    }
+
+    /**
+     * Removes the results of an earlier run and starts following the file.
+     */
+    public void start() {
+        if (file.exists() && !file.delete()) {
+            logger.warn("Could not remove old results file " + file);
+        }
+        stopping = false;
+        thread = new Thread(this, "ntp-result-stream");
+        thread.setDaemon(true);
+        thread.start();
+    }
+
+    /**
+     * Reads what is left of the file and stops following it.
+     */
+    public void stop() throws InterruptedException {
+        stopping = true;
+        thread.interrupt();
+        thread.join();
+        logger.info(String.format("Python test cases: %d passed, %d failed, %d errors, %d skipped",
+                passed, failed, errors, skipped));
+    }
+
+    public int getFailed() {
+        return failed;
+    }
+
+    public int getErrors() {
+        return errors;
+    }
+
+    @Override
+    public void run() {
+        while (true) {
+            boolean last = stopping;
+            try {
+                readNewLines();
+            } catch (IOException e) {
+                logger.warn("Could not read " + file + ": " + e.getMessage());
+            }
+            if (last) {
+                return;
+            }
+            try {
+                Thread.sleep(POLL_MILLIS);
+            } catch (InterruptedException e) {
+                // stop() wants one last read
+            }
+        }
+    }
+
+    /**
+     * Reads the complete lines appended since the last call. A line still
+     * being written is left for the next call.
+     */
+    private void readNewLines() throws IOException {
+        if (!file.exists()) {
+            return;
+        }
+        try (RandomAccessFile results = new RandomAccessFile(file, "r")) {
+            if (results.length() < offset) {
+                offset = 0;
+            }
+            results.seek(offset);
+            ByteArrayOutputStream line = new ByteArrayOutputStream();
+            int next;
+            while ((next = results.read()) != -1) {
+                if (next != '\n') {
+                    line.write(next);
+                    continue;
+                }
+                offset = results.getFilePointer();
+                report(new String(line.toByteArray(), UTF8));
+                line.reset();
+            }
+        }
+    }
+
+    private void report(String line) {
+        Map<String, Object> record;
+        try {
+            record = parseRecord(line);
+        } catch (IllegalArgumentException e) {
+            logger.warn("Skipping malformed result line: " + line);
+            return;
+        }
+        String status = String.valueOf(record.get("status"));
+        switch (status) {
+            case "failed":
+                failed++;
+                break;
+            case "error":
+                errors++;
+                break;
+            case "skipped":
+                skipped++;
+                break;
+            default:
+                passed++;
+        }
+        logger.info(String.format("%s:%s %s (%ss)", record.get("classname"),
+                record.get("name"), status.toUpperCase(), record.get("time")));
+    }
+
+    /**
+     * Parses one flat JSON object of string, number, boolean and null values,
+     * which is all ntp_results.py writes.
+     *
+     * @param line JSON text of one record
+     * @return The record
+     * @throws IllegalArgumentException when the line is not such an object
+     */
+    static Map<String, Object> parseRecord(String line) {
+        Map<String, Object> record = new LinkedHashMap<String, Object>();
+        int[] pos = {skipSpace(line, 0)};
+        expect(line, pos, '{');
+        if (peek(line, pos) == '}') {
+            return record;
+        }
+        while (true) {
+            String key = parseString(line, pos);
+            expect(line, pos, ':');
+            record.put(key, parseValue(line, pos));
+            char separator = peek(line, pos);
+            pos[0]++;
+            if (separator == '}') {
+                return record;
+            }
+            if (separator != ',') {
+                throw new IllegalArgumentException("Expected , or } at " + (pos[0] - 1));
+            }
+        }
+    }
+
+    private static int skipSpace(String line, int pos) {
+        while (pos < line.length() && Character.isWhitespace(line.charAt(pos))) {
+            pos++;
+        }
+        return pos;
+    }
+
+    private static char peek(String line, int[] pos) {
+        pos[0] = skipSpace(line, pos[0]);
+        if (pos[0] >= line.length()) {
+            throw new IllegalArgumentException("Unexpected end of line");
+        }
+        return line.charAt(pos[0]);
+    }
+
+    private static void expect(String line, int[] pos, char expected) {
+        if (peek(line, pos) != expected) {
+            throw new IllegalArgumentException("Expected " + expected + " at " + pos[0]);
+        }
+        pos[0]++;
+    }
+
+    private static Object parseValue(String line, int[] pos) {
+        char first = peek(line, pos);
+        if (first == '"') {
+            return parseString(line, pos);
+        }
+        int end = pos[0];
+        while (end < line.length() && ",}".indexOf(line.charAt(end)) < 0
+                && !Character.isWhitespace(line.charAt(end))) {
+            end++;
+        }
+        String token = line.substring(pos[0], end);
+        pos[0] = end;
+        switch (token) {
+            case "null":
+                return null;
+            case "true":
+                return Boolean.TRUE;
+            case "false":
+                return Boolean.FALSE;
+            default:
+                try {
+                    return Double.valueOf(token);
+                } catch (NumberFormatException e) {
+                    throw new IllegalArgumentException("Bad value " + token, e);
+                }
+        }
+    }
+
+    private static String parseString(String line, int[] pos) {
+        expect(line, pos, '"');
+        StringBuilder value = new StringBuilder();
+        while (pos[0] < line.length()) {
+            char c = line.charAt(pos[0]++);
+            if (c == '"') {
+                return value.toString();
+            }
+            if (c != '\\') {
+                value.append(c);
+                continue;
+            }
+            if (pos[0] >= line.length()) {
+                break;
+            }
+            char escaped = line.charAt(pos[0]++);
+            switch (escaped) {
+                case 'n':
+                    value.append('\n');
+                    break;
+                case 't':
+                    value.append('\t');
+                    break;
+                case 'r':
+                    value.append('\r');
+                    break;
+                case 'b':
+                    value.append('\b');
+                    break;
+                case 'f':
+                    value.append('\f');
+                    break;
+                case 'u':
+                    if (pos[0] + 4 > line.length()) {
+                        throw new IllegalArgumentException("Bad unicode escape");
+                    }
+                    value.append((char) Integer.parseInt(line.substring(pos[0], pos[0] + 4), 16));
+                    pos[0] += 4;
+                    break;
+                default:
+                    value.append(escaped);
+            }
+        }
+        throw new IllegalArgumentException("Unterminated string");
+    }
+}
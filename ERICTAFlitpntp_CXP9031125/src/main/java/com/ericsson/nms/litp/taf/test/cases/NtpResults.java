@@ -0,0 +1,99 @@
+package com.ericsson.nms.litp.taf.test.cases;
+
+import java.io.*;
+import java.nio.charset.Charset;
+import java.util.Iterator;
+import java.util.Map;
+import java.util.NoSuchElementException;
+
+import org.apache.log4j.Logger;
+
+import com.ericsson.cifwk.taf.annotations.DataSource;
+
+/**
+ * Data provider of the "ntp-results" data driven test. TAF creates it
+ * through its no argument constructor and reads the results file that
+ * {@link NtpResultStream} followed during the run.
+ */
+public class NtpResults {
+
+    private static final Logger logger = Logger.getLogger(NtpResults.class);
+    private static final Charset UTF8 = Charset.forName("UTF-8");
+
+    /**
+     * Data source of the "ntp-results" data driven test. Records are read
+     * from the file as the test asks for them.
+     *
+     * @return One map per case, with the keys written by ntp_results.py
+     */
+    @DataSource
+    public Iterable<Map<String, Object>> results() {
+        final File results = NtpResultStream.resultsFile();
+        return new Iterable<Map<String, Object>>() {
+            @Override
+            public Iterator<Map<String, Object>> iterator() {
+                try {
+                    return new RecordIterator(new BufferedReader(new InputStreamReader(
+                            new FileInputStream(results), UTF8)));
+                } catch (FileNotFoundException e) {
+                    throw new IllegalStateException("No python test results in " + results, e);
+                }
+            }
+        };
+    }
+
+    /**
+     * Iterates over the records of a results file, skipping a last line cut
+     * short when the run was killed.
+     */
+    private static class RecordIterator implements Iterator<Map<String, Object>> {
+
+        private final BufferedReader reader;
+        private Map<String, Object> next;
+
+        RecordIterator(BufferedReader reader) {
+            this.reader = reader;
+        }
+
+        @Override
+        public boolean hasNext() {
+            while (next == null) {
+                String line;
+                try {
+                    line = reader.readLine();
+                } catch (IOException e) {
+                    throw new IllegalStateException(e);
+                }
+                if (line == null) {
+                    try {
+                        reader.close();
+                    } catch (IOException e) {
+                        logger.warn("Could not close results file: " + e.getMessage());
+                    }
+                    return false;
+                }
+                try {
+                    next = NtpResultStream.parseRecord(line);
+                } catch (IllegalArgumentException e) {
+                    logger.warn("Skipping malformed result line: " + line);
+                }
+            }
+            return true;
+        }
+
+        @Override
+        public Map<String, Object> next() {
+            if (!hasNext()) {
+                throw new NoSuchElementException();
+            }
+            Map<String, Object> record = next;
+            next = null;
+            return record;
+        }
+
+        @Override
+        public void remove() {
+            throw new UnsupportedOperationException();
+        }
+    }
+}
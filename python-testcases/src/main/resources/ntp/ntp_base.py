@@ -0,0 +1,44 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   GenericTest with every mixin of the NTP testsets, in the
+            order they depend on
+"""
+from litp_generic_test import GenericTest
+from ntp_model_index import ModelIndexMixin
+from ntp_preflight import PreflightMixin
+from ntp_profile import ProfileMixin
+from ntp_results import ResultStreamMixin
+from ntp_revert import RevertSnapshotMixin
+from ntp_ssh_pool import SshPoolMixin
+from ntp_standin import StandinMixin
+from ntp_timing import TimingMixin
+
+
+class NtpGenericTest(ProfileMixin,
+                     # reports the outcome the profiled run ends with
+                     ResultStreamMixin,
+                     # times everything but profiling and reporting
+                     TimingMixin,
+                     # snapshots 'revert' cases, only once preflight and
+                     # the mixins below have set up
+                     RevertSnapshotMixin,
+                     # fails or skips before any snapshot is taken
+                     PreflightMixin,
+                     # wraps the stand-in, so offline runs use the index
+                     ModelIndexMixin,
+                     # replaces GenericTest when NTP_STANDIN is set
+                     StandinMixin,
+                     # replaces only the run_command of GenericTest
+                     SshPoolMixin,
+                     GenericTest):
+    """
+    Base class of the NTP testsets, so the mixins and their order are
+    defined in one place.
+    """
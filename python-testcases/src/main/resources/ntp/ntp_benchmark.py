@@ -0,0 +1,274 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Wall time benchmark of the NTP test cases with regression
+            thresholds against a stored baseline
+
+Usage:
+    python ntp_benchmark.py --iterations 5 --standin --update-baseline
+    python ntp_benchmark.py --iterations 5 --standin --threshold 20
+
+Every iteration runs all cases of ordered_tcs.txt once, in order, in a
+fresh process with its own ntp_timing file. The timing records of each
+case are split into setup, model CLI, plan, propagation wait and
+verification time. The p50 and p95 over the iterations are compared
+with the baseline and the run fails when either regresses by more than
+the threshold.
+"""
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+from ntp_scheduler import HERE, nose_name, read_lines
+from ntp_timing import TIMING_FILE_ENV, case_name, load_records
+from ntp_standin import STANDIN_ENV
+from ntp_stats import percentile
+
+DEFAULT_BASELINE = os.path.join(HERE, "ntp_benchmark_baseline.json")
+DEFAULT_RUNNER = "nosetests -v"
+
+CATEGORIES = {
+    "setup": "setup",
+    "teardown": "setup",
+    "snapshot": "setup",
+    "revert": "setup",
+    "cli": "model_cli",
+    "plan": "plan",
+    "puppet_wait": "propagation_wait",
+    "ntpstat": "propagation_wait",
+    "wait": "propagation_wait",
+    "ntp_conf": "verification",
+    "command": "verification",
+    "ntpq": "verification",
+}
+PHASES = ("setup", "model_cli", "plan", "propagation_wait", "verification",
+          "other", "total")
+
+
+def _union(intervals):
+    """
+    Returns the total length covered by (start, end) intervals.
+    """
+    total = 0.0
+    end = None
+    for start, stop in sorted(intervals):
+        if end is None or start > end:
+            total += stop - start
+            end = stop
+        elif stop > end:
+            total += stop - end
+            end = stop
+
+    return total
+
+
+def split_case_time(records):
+    """
+    Description:
+        Splits the wall time of a case into phases. Only outermost
+        records count, so a command run inside a plan wait is not
+        counted twice, and overlapping records of the same phase, like
+        parallel per node waits, count once.
+    Args:
+        records (list): Timing records of a single case run.
+    Returns:
+        dict. Seconds per phase, including 'other' and 'total'.
+    """
+    total = sum(record["duration"] for record in records
+                if record["operation"] == "test")
+    spans = [(record["start"], record["start"] + record["duration"],
+              record) for record in records
+             if record["operation"] in CATEGORIES]
+    outermost = [(start, end, record) for start, end, record in spans
+                 if not any(other is not record and
+                            other_start <= start and end <= other_end and
+                            (other_start, -other_end) < (start, -end)
+                            for other_start, other_end, other in spans)]
+    phases = dict((phase, 0.0) for phase in PHASES)
+    for phase in set(CATEGORIES.values()):
+        phases[phase] = _union([(start, end) for start, end, record
+                                in outermost
+                                if CATEGORIES[record["operation"]] ==
+                                phase])
+    phases["total"] = total
+    phases["other"] = max(0.0, total - sum(
+        phases[phase] for phase in set(CATEGORIES.values())))
+
+    return phases
+
+
+def collect_samples(timing_files):
+    """
+    Description:
+        Reads timing files, one per iteration.
+    Args:
+        timing_files (list): JSON lines files written by ntp_timing.
+    Returns:
+        dict. List of phase splits per case.
+    """
+    samples = {}
+    for path in timing_files:
+        per_case = {}
+        for record in load_records(path):
+            if record.get("test"):
+                per_case.setdefault(case_name(record["test"]),
+                                    []).append(record)
+        for case, records in per_case.items():
+            samples.setdefault(case, []).append(split_case_time(records))
+
+    return samples
+
+
+def summarise(samples):
+    """
+    Description:
+        Computes p50 and p95 of every phase of every case.
+    Args:
+        samples (dict): From collect_samples.
+    Returns:
+        dict. {case: {phase: {"p50": s, "p95": s}}}
+    """
+    summary = {}
+    for case, runs in samples.items():
+        summary[case] = dict(
+            (phase, {"p50": percentile([run[phase] for run in runs], 50),
+                     "p95": percentile([run[phase] for run in runs], 95)})
+            for phase in PHASES)
+
+    return summary
+
+
+def regressions(summary, baseline, threshold_pct):
+    """
+    Description:
+        Compares the total time of every case with the baseline.
+    Args:
+        summary (dict): From summarise.
+        baseline (dict): Summary stored by an earlier run.
+        threshold_pct (float): Allowed slowdown in percent.
+    Returns:
+        list. Messages for every p50 or p95 over the threshold.
+    """
+    failures = []
+    for case in sorted(summary):
+        if case not in baseline:
+            continue
+        for stat in ("p50", "p95"):
+            old = baseline[case]["total"][stat]
+            new = summary[case]["total"][stat]
+            if old > 0 and new > old * (1 + threshold_pct / 100.0):
+                failures.append("{0} {1} {2:.1f}s -> {3:.1f}s (+{4:.0f}%)"
+                                .format(case, stat, old, new,
+                                        (new / old - 1) * 100))
+
+    return failures
+
+
+def run_iterations(cases, iterations, runner, standin):
+    """
+    Description:
+        Runs all cases once per iteration, each time in a new process
+        writing its own timing file. An iteration whose runner fails is
+        left out, so a run cut short does not pass for a fast one.
+    Args:
+        cases (list): Cases in ordered_tcs.txt order.
+        iterations (int): Number of runs.
+        runner (str): Test runner command.
+        standin (bool): Run against the in-process stand-in.
+    Returns:
+        list. Timing file of every iteration that passed.
+    """
+    names = [nose_name(case) for case in cases]
+    timing_dir = tempfile.mkdtemp(prefix="ntp_benchmark_")
+    timing_files = []
+    for iteration in range(iterations):
+        timing_file = os.path.join(timing_dir,
+                                   "iteration_{0}.jsonl".format(iteration))
+        env = dict(os.environ)
+        env[TIMING_FILE_ENV] = timing_file
+        if standin:
+            env[STANDIN_ENV] = "1"
+        exit_code = subprocess.call(shlex.split(runner) + names, cwd=HERE,
+                                    env=env)
+        if exit_code != 0:
+            sys.stderr.write("Iteration {0} failed with exit code {1}, its "
+                             "timings are left out\n".format(iteration,
+                                                             exit_code))
+            continue
+        timing_files.append(timing_file)
+
+    return timing_files
+
+
+def main():
+    """
+    Description:
+        Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--tcs", default=os.path.join(HERE,
+                                                      "ordered_tcs.txt"))
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--standin", action="store_true",
+                        help="run against the in-process stand-in")
+    parser.add_argument("--runner", default=DEFAULT_RUNNER)
+    parser.add_argument("--timings", nargs="*",
+                        help="analyse existing timing files, one per "
+                             "iteration, instead of running the cases")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="allowed p50/p95 slowdown in percent")
+    args = parser.parse_args()
+
+    timing_files = args.timings or run_iterations(
+        read_lines(args.tcs), args.iterations, args.runner, args.standin)
+    if not timing_files:
+        sys.stderr.write("No iteration passed, nothing to compare\n")
+        return 1
+    failed = 0 if args.timings else args.iterations - len(timing_files)
+    summary = summarise(collect_samples(timing_files))
+
+    print("{0:70} {1}".format("case", " ".join(
+        "{0:>16}".format(phase) for phase in PHASES)))
+    for case in sorted(summary):
+        print("{0:70} {1}".format(case, " ".join(
+            "{0:7.1f}/{1:<8.1f}".format(summary[case][phase]["p50"],
+                                        summary[case][phase]["p95"])
+            for phase in PHASES)))
+
+    if failed:
+        sys.stderr.write("{0} of {1} iteration(s) failed\n".format(
+            failed, args.iterations))
+    if args.update_baseline:
+        if failed:
+            sys.stderr.write("Baseline not updated\n")
+            return 1
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(summary, baseline_file, indent=2, sort_keys=True)
+        print("Baseline written to {0}".format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline at {0}".format(args.baseline))
+        return 1 if failed else 0
+    with open(args.baseline) as baseline_file:
+        failures = regressions(summary, json.load(baseline_file),
+                               args.threshold)
+    for failure in failures:
+        sys.stderr.write("REGRESSION {0}\n".format(failure))
+
+    return 1 if failures or failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
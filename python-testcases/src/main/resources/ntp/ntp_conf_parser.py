@@ -0,0 +1,179 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Parser turning the contents of ntp.conf into typed records
+            indexed by directive and by address
+"""
+from collections import namedtuple
+
+ServerEntry = namedtuple('ServerEntry',
+                         ['line_no', 'address', 'options', 'comment'])
+FudgeEntry = namedtuple('FudgeEntry',
+                        ['line_no', 'address', 'options', 'comment'])
+RestrictEntry = namedtuple('RestrictEntry',
+                           ['line_no', 'address', 'options', 'comment'])
+DriftfileEntry = namedtuple('DriftfileEntry',
+                            ['line_no', 'path', 'comment'])
+CommentEntry = namedtuple('CommentEntry', ['line_no', 'text'])
+DirectiveEntry = namedtuple('DirectiveEntry',
+                            ['line_no', 'directive', 'args', 'comment'])
+
+ADDRESS_ENTRIES = {
+    'server': ServerEntry,
+    'fudge': FudgeEntry,
+    'restrict': RestrictEntry,
+}
+
+
+def _parse_line(line_no, line):
+    """
+    Description:
+        Converts a single line of ntp.conf into a record.
+    Args:
+        line_no (int): 1 based line number.
+        line (str): Line as read from the file.
+    Returns:
+        namedtuple. The record for the line or None for a blank line.
+    """
+    stripped = line.strip()
+    if not stripped:
+        return None
+    if stripped.startswith('#'):
+        return CommentEntry(line_no, stripped.lstrip('#').strip())
+
+    comment = None
+    if '#' in stripped:
+        stripped, comment = stripped.split('#', 1)
+        comment = comment.strip()
+    fields = stripped.split()
+    directive, args = fields[0], fields[1:]
+
+    # '-4' and '-6' before the address restrict name resolution to one
+    # address family; they are kept as the first option
+    qualifiers = args[:1] if args[:1] in (['-4'], ['-6']) else []
+    address_args = args[len(qualifiers):]
+    if directive in ADDRESS_ENTRIES and address_args:
+        return ADDRESS_ENTRIES[directive](line_no, address_args[0],
+                                          qualifiers + address_args[1:],
+                                          comment)
+    if directive == 'driftfile' and args:
+        return DriftfileEntry(line_no, args[0], comment)
+
+    return DirectiveEntry(line_no, directive, args, comment)
+
+
+class NtpConf(object):
+    """
+    Parsed view of an ntp.conf file. The file is scanned once when the
+    object is built; every lookup afterwards is a dictionary access.
+    Commented out directives are kept as CommentEntry records and are
+    never reported as active servers.
+    """
+
+    def __init__(self, lines):
+        """
+        Args:
+            lines (list): Lines of the file, as returned by run_command.
+        """
+        self.entries = []
+        self._by_directive = {}
+        self._by_address = {}
+
+        for line_no, line in enumerate(lines, 1):
+            entry = _parse_line(line_no, line)
+            if entry is None:
+                continue
+            self.entries.append(entry)
+            self._by_directive.setdefault(self._directive(entry),
+                                          []).append(entry)
+            address = getattr(entry, 'address', None)
+            if address is not None:
+                self._by_address.setdefault(address, []).append(entry)
+
+    @staticmethod
+    def _directive(entry):
+        """
+        Returns the directive name a record is indexed under.
+        """
+        if isinstance(entry, DirectiveEntry):
+            return entry.directive
+        if isinstance(entry, CommentEntry):
+            return '#'
+        for directive, entry_type in ADDRESS_ENTRIES.items():
+            if isinstance(entry, entry_type):
+                return directive
+
+        return 'driftfile'
+
+    def entries_for(self, directive):
+        """
+        Description:
+            Returns every record for a directive, '#' for comments.
+        Args:
+            directive (str): Directive name, e.g. 'server'.
+        Returns:
+            list. Records in file order.
+        """
+        return list(self._by_directive.get(directive, []))
+
+    def entries_for_address(self, address):
+        """
+        Description:
+            Returns every server, fudge and restrict record for an
+            address.
+        Args:
+            address (str): Address or hostname as written in the file.
+        Returns:
+            list. Records in file order.
+        """
+        return list(self._by_address.get(address, []))
+
+    def servers(self):
+        """
+        Returns:
+            list. Active server records in file order. A server line
+            without an address is not one.
+        """
+        return [entry for entry in self.entries_for('server')
+                if isinstance(entry, ServerEntry)]
+
+    def server_addresses(self):
+        """
+        Returns:
+            list. Addresses of the active servers in file order.
+        """
+        return [entry.address for entry in self.servers()]
+
+    def has_server(self, address):
+        """
+        Description:
+            Checks whether an uncommented server line exists for an
+            address.
+        Args:
+            address (str): Address or hostname.
+        Returns:
+            bool. True if the server is configured.
+        """
+        return any(isinstance(entry, ServerEntry)
+                   for entry in self._by_address.get(address, []))
+
+    def fudge(self, address):
+        """
+        Description:
+            Returns the fudge record for an address.
+        Args:
+            address (str): Address of the fudged clock.
+        Returns:
+            FudgeEntry. The first matching record or None.
+        """
+        for entry in self._by_address.get(address, []):
+            if isinstance(entry, FudgeEntry):
+                return entry
+
+        return None
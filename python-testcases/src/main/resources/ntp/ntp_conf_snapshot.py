@@ -0,0 +1,253 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Cached copy of /etc/ntp.conf per node so that several
+            patterns can be checked with a single remote read
+"""
+import re
+import time
+import test_constants as const
+from ntp_conf_parser import NtpConf
+from ntp_parallel import run_command_on_nodes, format_node_failures
+from ntp_timing import timed
+
+MD5SUM_PATH = "/usr/bin/md5sum"
+
+# Cached copies per file, shared by all snapshots of the session
+_CACHE = {}
+
+
+class NtpConfSnapshot(object):
+    """
+    Reads /etc/ntp.conf once per node and answers grep style queries
+    against the cached contents. Call refresh() after every step that
+    can change the file (plan run, puppet cycle) to take a new copy.
+    The checksum of every cached copy is kept, and refresh() only reads
+    and parses the file again on nodes where the checksum changed.
+    Copies are shared by every snapshot of the same file in the
+    session, but each snapshot checks the checksum before it first
+    uses the copy of a node. hits and misses count the nodes a refresh
+    could keep and had to read.
+    """
+
+    def __init__(self, test, conf_file=const.NTPD_CFG_FILE, su_root=False):
+        """
+        Args:
+            test (GenericTest): Test instance used to run the commands.
+            conf_file (str): Path of the file to snapshot.
+            su_root (bool): Read the file as root.
+        """
+        self.test = test
+        self.conf_file = conf_file
+        self.su_root = su_root
+        cache = _CACHE.setdefault(conf_file, ({}, {}, {}))
+        self._contents, self._parsed, self._sums = cache
+        self._verified = set()
+        self.hits = 0
+        self.misses = 0
+
+    def refresh(self, nodes):
+        """
+        Description:
+            Brings the cached copies of the given nodes up to date. The
+            checksum of the file is read on every node that has a
+            cached copy and only the nodes where it changed, or that
+            have no copy yet, read the whole file again. Fails the test
+            with one report listing every node where the file could not
+            be read.
+        Args:
+            nodes (list): Node filenames to read the file from.
+        """
+        cached = [node for node in nodes if node in self._sums]
+        unchanged = []
+        if cached:
+            with timed("ntp_conf", ",".join(cached), MD5SUM_PATH):
+                sums = self.checksums(cached)
+            unchanged = [node for node in cached
+                         if sums[node] is not None and
+                         sums[node] == self._sums[node]]
+        self.hits += len(unchanged)
+        self._verified.update(unchanged)
+        self._read([node for node in nodes if node not in unchanged])
+
+    def _read(self, nodes):
+        """
+        Reads the checksum and contents of the file on every node in
+        one command per node and replaces the cached copies.
+        """
+        if not nodes:
+            return
+        self.misses += len(nodes)
+        cmd = "{0} {1} && {2} {1}".format(MD5SUM_PATH, self.conf_file,
+                                           const.CAT_PATH)
+        failures = []
+        with timed("ntp_conf", ",".join(nodes), cmd):
+            results = run_command_on_nodes(self.test, nodes, cmd,
+                                           su_root=self.su_root)
+        for result in results:
+            self._parsed.pop(result.node, None)
+            if result.rc != 0 or result.stderr or not result.stdout:
+                failures.append((result.node,
+                                 "could not read {0}: rc={1}, stderr={2}"
+                                 .format(self.conf_file, result.rc,
+                                         result.stderr)))
+                self._contents.pop(result.node, None)
+                self._sums.pop(result.node, None)
+                self._verified.discard(result.node)
+            else:
+                self._sums[result.node] = result.stdout[0].split()[0]
+                self._contents[result.node] = result.stdout[1:]
+                self._verified.add(result.node)
+
+        self.test.assertEqual([], failures, format_node_failures(failures))
+
+    def invalidate(self, nodes=None):
+        """
+        Description:
+            Drops the cached copy for the given nodes, or for all nodes
+            when none are given.
+        Args:
+            nodes (list): Node filenames to forget.
+        """
+        if nodes is None:
+            self._contents.clear()
+            self._parsed.clear()
+            self._sums.clear()
+            self._verified.clear()
+            return
+        for node in nodes:
+            self._contents.pop(node, None)
+            self._parsed.pop(node, None)
+            self._sums.pop(node, None)
+            self._verified.discard(node)
+
+    def lines(self, node):
+        """
+        Description:
+            Returns the cached lines of the file, refreshing it first if
+            this snapshot has not checked the copy of the node yet.
+        Args:
+            node (str): Node filename.
+        Returns:
+            list. Lines of the file.
+        """
+        if node not in self._verified:
+            self.refresh([node])
+
+        return self._contents[node]
+
+    def grep(self, node, patterns):
+        """
+        Description:
+            Local equivalent of running get_grep_file_cmd on the node.
+            Patterns are evaluated as Python regular expressions, which
+            behave like grep for the patterns used by the NTP testsets.
+        Args:
+            node (str): Node filename.
+            patterns (str|list): Pattern or list of patterns. A line is
+                                 returned if it matches any of them.
+        Returns:
+            list. Matching lines in file order.
+        """
+        if not isinstance(patterns, (list, tuple)):
+            patterns = [patterns]
+        regexes = [re.compile(pattern) for pattern in patterns]
+
+        return [line for line in self.lines(node)
+                if any(regex.search(line) for regex in regexes)]
+
+    def parsed(self, node):
+        """
+        Description:
+            Returns the parsed view of the cached file. The copy is
+            parsed once and reused until a refresh finds the file
+            changed.
+        Args:
+            node (str): Node filename.
+        Returns:
+            NtpConf. Parsed contents of the file.
+        """
+        lines = self.lines(node)
+        if node not in self._parsed:
+            self._parsed[node] = NtpConf(lines)
+
+        return self._parsed[node]
+
+    def checksums(self, nodes):
+        """
+        Description:
+            Reads the checksum of the file on every node concurrently.
+            This is much cheaper than reading the whole file.
+        Args:
+            nodes (list): Node filenames.
+        Returns:
+            dict. Checksum per node, None where it could not be read.
+        """
+        cmd = "{0} {1}".format(MD5SUM_PATH, self.conf_file)
+        sums = {}
+        for result in run_command_on_nodes(self.test, nodes, cmd,
+                                           su_root=self.su_root):
+            if result.rc == 0 and result.stdout:
+                sums[result.node] = result.stdout[0].split()[0]
+            else:
+                sums[result.node] = None
+
+        return sums
+
+    def wait_for(self, nodes, predicate, timeout_secs, poll_interval=5):
+        """
+        Description:
+            Waits until the file on every node satisfies predicate.
+            The file checksum is polled and the file is only read and
+            parsed again on nodes where the checksum changed, so the
+            wait ends as soon as puppet has written the expected
+            content instead of after a fixed puppet interval.
+        Args:
+            nodes (list): Node filenames to watch.
+            predicate (callable): Takes an NtpConf and returns True
+                                  once the expected content is there.
+            timeout_secs (int): Give up after this many seconds,
+                                normally the puppet interval.
+            poll_interval (int): Seconds between checksum polls.
+        Returns:
+            bool. True if all nodes matched before the timeout.
+        """
+        with timed("puppet_wait", ",".join(nodes), self.conf_file):
+            return self._wait_for(nodes, predicate, timeout_secs,
+                                  poll_interval)
+
+    def _wait_for(self, nodes, predicate, timeout_secs, poll_interval):
+        """
+        Polling loop of wait_for.
+        """
+        deadline = time.time() + timeout_secs
+        last_sums = {}
+        pending = list(nodes)
+        while True:
+            sums = self.checksums(pending)
+            changed = [node for node in pending
+                       if sums[node] is not None and
+                       sums[node] != last_sums.get(node)]
+            last_sums.update(sums)
+            stale = [node for node in changed
+                     if sums[node] != self._sums.get(node)]
+            self.hits += len(changed) - len(stale)
+            self._verified.update(node for node in changed
+                                  if node not in stale)
+            self._read(stale)
+            pending = [node for node in pending
+                       if node not in changed or
+                       not predicate(self.parsed(node))]
+            if not pending:
+                return True
+            if time.time() >= deadline:
+                self.test.log("info", "{0} not updated on {1} after {2}s"
+                              .format(self.conf_file, pending, timeout_secs))
+                return False
+            time.sleep(poll_interval)
@@ -0,0 +1,111 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Node filenames, addresses and model URLs of the deployment,
+            resolved once per test session
+"""
+import os
+import threading
+from collections import namedtuple
+
+SCALE_ENV = "NTP_PEER_SCALE"
+_LOCK = threading.Lock()
+_DEPLOYMENT = []
+
+
+class Deployment(namedtuple('Deployment', ['ms_node', 'ms_ip', 'peer_nodes',
+                                           'peer_ips', 'peer_urls'])):
+    """
+    Read only description of the deployment under test. peer_nodes,
+    peer_ips and peer_urls are tuples in the same order.
+    """
+    __slots__ = ()
+
+    @property
+    def all_nodes(self):
+        """
+        Returns:
+            tuple. The MS followed by the peer nodes.
+        """
+        return (self.ms_node,) + self.peer_nodes
+
+    def scaled_peer_nodes(self):
+        """
+        Description:
+            Returns the peer nodes a scalable testset should use: the
+            first NTP_PEER_SCALE of them, or all when it is not set.
+        Returns:
+            tuple. Peer node filenames, fewer than asked for when the
+            deployment is smaller.
+        """
+        scale = peer_scale()
+        if not scale:
+            return self.peer_nodes
+        return self.peer_nodes[:scale]
+
+    def node_url(self, node):
+        """
+        Description:
+            Returns the model URL of a peer node.
+        Args:
+            node (str): Peer node filename.
+        Returns:
+            str. Model URL of the node.
+        """
+        return self.peer_urls[self.peer_nodes.index(node)]
+
+    def node_ip(self, node):
+        """
+        Description:
+            Returns the IPv4 address of a node.
+        Args:
+            node (str): MS or peer node filename.
+        Returns:
+            str. IPv4 address of the node.
+        """
+        if node == self.ms_node:
+            return self.ms_ip
+        return self.peer_ips[self.peer_nodes.index(node)]
+
+
+def peer_scale():
+    """
+    Returns:
+        int. Number of peer nodes asked for in NTP_PEER_SCALE, 0 when it
+        is not set or empty.
+    """
+    return int(os.environ.get(SCALE_ENV) or 0)
+
+
+def get_deployment(test):
+    """
+    Description:
+        Returns the deployment, resolving it through the test the first
+        time it is asked for. The values do not change during a run so
+        every later test reuses the same object.
+    Args:
+        test (GenericTest): Test instance used for the first lookup.
+    Returns:
+        Deployment. The deployment under test.
+    """
+    with _LOCK:
+        if not _DEPLOYMENT:
+            ms_node = test.get_management_node_filename()
+            peer_nodes = tuple(test.get_managed_node_filenames())
+            _DEPLOYMENT.append(Deployment(
+                ms_node=ms_node,
+                ms_ip=test.get_node_att(ms_node, 'ipv4'),
+                peer_nodes=peer_nodes,
+                peer_ips=tuple(test.get_node_att(node, 'ipv4')
+                               for node in peer_nodes),
+                peer_urls=tuple(test.get_node_url_from_filename(ms_node,
+                                                                node)
+                                for node in peer_nodes)))
+
+    return _DEPLOYMENT[0]
@@ -0,0 +1,166 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   SQLite store of the duration of every case in every run,
+            used to balance shards
+
+Usage:
+    python ntp_durations.py record /tmp/ntp_results.jsonl
+    python ntp_durations.py show
+
+record adds the cases of a results file written by ntp_results as one
+run. show prints the expected duration of every case, the median of its
+latest passing runs.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from ntp_results import DEFAULT_RESULTS_FILE, load_results
+from ntp_stats import percentile
+
+DURATIONS_DB_ENV = "NTP_DURATIONS_DB"
+DEFAULT_DURATIONS_DB = os.path.join(os.path.expanduser("~"),
+                                    ".ntp_durations.sqlite")
+# Runs of a case the expected duration is taken from
+HISTORY = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS durations (
+    run_id TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    deployment TEXT,
+    case_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS durations_case
+    ON durations (case_name, recorded_at);
+"""
+
+
+def result_case(record):
+    """
+    Description:
+        Converts a results record to the 'file.py:test_name' form of
+        ordered_tcs.txt.
+    Args:
+        record (dict): Record from ntp_results.load_results.
+    Returns:
+        str. Case name.
+    """
+    return "{0}.py:{1}".format(record["classname"].rsplit(".", 1)[0],
+                               record["name"])
+
+
+class DurationStore(object):
+    """
+    Per case durations of every recorded run. Each deployment can keep
+    its own store or several can share one file; SQLite serialises the
+    writers.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): Database file, NTP_DURATIONS_DB or
+                        ~/.ntp_durations.sqlite when None.
+        """
+        self.path = path or os.environ.get(DURATIONS_DB_ENV,
+                                           DEFAULT_DURATIONS_DB)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Description:
+            Closes the database.
+        """
+        self._conn.close()
+
+    def record_run(self, records, deployment=None, run_id=None):
+        """
+        Description:
+            Stores the cases of one run in a single transaction.
+        Args:
+            records (list): Records from ntp_results.load_results.
+            deployment (str): Deployment the run used.
+            run_id (str): Run identifier, the current time when None.
+        Returns:
+            int. Number of cases stored.
+        """
+        now = time.time()
+        run_id = run_id or "{0:.0f}".format(now)
+        rows = [(run_id, now, deployment, result_case(record),
+                 record["status"], record["time"])
+                for record in records if record["status"] != "skipped"]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO durations VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+        return len(rows)
+
+    def expected(self, cases=None, history=HISTORY):
+        """
+        Description:
+            Expected duration of cases, the median of their latest
+            passing runs, or of their latest runs of any status when
+            none passed.
+        Args:
+            cases (list): Cases to look up, all stored cases when None.
+            history (int): Number of latest runs to use.
+        Returns:
+            dict. Seconds per case; cases never recorded are left out.
+        """
+        samples = {}
+        for case, status, seconds in self._conn.execute(
+                "SELECT case_name, status, seconds FROM durations "
+                "ORDER BY recorded_at DESC"):
+            if cases is not None and case not in cases:
+                continue
+            passed, other = samples.setdefault(case, ([], []))
+            (passed if status == "passed" else other).append(seconds)
+
+        return dict((case, percentile((passed or other)[:history], 50))
+                    for case, (passed, other) in samples.items())
+
+
+def main():
+    """
+    Description:
+        Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--db", help="database file, default {0}".format(
+        DEFAULT_DURATIONS_DB))
+    commands = parser.add_subparsers(dest="command")
+    record = commands.add_parser("record", help="store a results file")
+    record.add_argument("results", nargs="?", default=DEFAULT_RESULTS_FILE)
+    record.add_argument("--deployment")
+    commands.add_parser("show", help="print expected durations")
+    args = parser.parse_args()
+
+    store = DurationStore(args.db)
+    try:
+        if args.command == "record":
+            count = store.record_run(load_results(args.results),
+                                     args.deployment)
+            print("Recorded {0} case(s) in {1}".format(count, store.path))
+        else:
+            expected = store.expected()
+            for case in sorted(expected):
+                print("{0:8.1f}s {1}".format(expected[case], case))
+    finally:
+        store.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Runs the steps of a model change and verify flow at the
+            same time, cancelling the rest when the first one fails
+
+A Flow runs every step on its own thread. Steps that poll, like the
+ntpstat wait, sleep and check through the flow, so they stop as soon as
+another step has failed instead of running on to their own deadline.
+
+GenericTest does not promise that the connection to a node is safe to
+use from several threads, so steps must not send commands to the same
+node. Give each step its own nodes, for example one step per node.
+"""
+import sys
+import threading
+
+DEFAULT_MAX_WORKERS = 8
+
+if sys.version_info[0] >= 3:
+    def reraise(exc_info):
+        """
+        Description:
+            Raises the exception of a sys.exc_info() tuple again with
+            the traceback of where it was first raised.
+        Args:
+            exc_info (tuple): (type, value, traceback)
+        """
+        raise exc_info[1].with_traceback(exc_info[2])
+else:
+    # The three argument raise is a syntax error on Python 3
+    exec("def reraise(exc_info):\n"  # pylint: disable=exec-used
+         "    raise exc_info[0], exc_info[1], exc_info[2]\n")
+
+
+class FlowCancelled(Exception):
+    """
+    Raised in a step when another step of its flow has failed.
+    """
+
+
+class Step(object):
+    """
+    A callable running on its own thread, like a task of an event loop.
+    """
+
+    def __init__(self, flow, func, args, kwargs):
+        self.flow = flow
+        self.value = None
+        self.exc_info = None
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def _run(self):
+        """
+        Runs the callable and cancels the flow if it fails.
+        """
+        try:
+            self.value = self._func(*self._args, **self._kwargs)
+        except Exception:  # pylint: disable=broad-except
+            self.exc_info = sys.exc_info()
+            if not isinstance(self.exc_info[1], FlowCancelled):
+                self.flow.cancel(self)
+
+    def start(self):
+        """
+        Description:
+            Starts the step.
+        """
+        self._thread.start()
+
+    def wait(self):
+        """
+        Description:
+            Waits for the step to finish.
+        """
+        self._thread.join()
+
+    def result(self):
+        """
+        Description:
+            Waits for the step to finish.
+        Returns:
+            object. What the callable returned.
+        """
+        self.wait()
+        if self.exc_info is not None:
+            reraise(self.exc_info)
+
+        return self.value
+
+
+class Flow(object):
+    """
+    Steps started together and waited on together. The first step to
+    fail cancels the others and its exception is the one join raises.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Args:
+            max_workers (int): Upper bound on steps running at once.
+        """
+        self.steps = []
+        self.failed_step = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_workers)
+
+    @property
+    def cancelled(self):
+        """
+        True once a step has failed.
+        """
+        return self._cancelled.is_set()
+
+    def cancel(self, step=None):
+        """
+        Description:
+            Cancels every step still running.
+        Args:
+            step (Step): Step whose failure cancels the flow.
+        """
+        with self._lock:
+            if self.failed_step is None:
+                self.failed_step = step
+        self._cancelled.set()
+
+    def check(self):
+        """
+        Description:
+            Raises FlowCancelled if the flow has been cancelled. Steps
+            call it between remote commands.
+        """
+        if self._cancelled.is_set():
+            raise FlowCancelled()
+
+    def sleep(self, secs):
+        """
+        Description:
+            Sleeps like time.sleep but wakes up with FlowCancelled as
+            soon as the flow is cancelled.
+        Args:
+            secs (float): Seconds to sleep.
+        """
+        if self._cancelled.wait(secs):
+            raise FlowCancelled()
+
+    def spawn(self, func, *args, **kwargs):
+        """
+        Description:
+            Starts func(*args, **kwargs) as a step of the flow.
+        Returns:
+            Step. The running step.
+        """
+        def limited(*args, **kwargs):
+            """
+            Runs func once a worker slot is free.
+            """
+            with self._slots:
+                self.check()
+                return func(*args, **kwargs)
+
+        step = Step(self, limited, args, kwargs)
+        self.steps.append(step)
+        step.start()
+
+        return step
+
+    def join(self):
+        """
+        Description:
+            Waits for every step. Raises the exception of the step that
+            failed first, if any.
+        Returns:
+            list. The result of every step, in the order they started.
+        """
+        for step in self.steps:
+            step.wait()
+        if self.failed_step is not None:
+            reraise(self.failed_step.exc_info)
+
+        return [step.value for step in self.steps]
+
+
+def run_concurrently(*steps):
+    """
+    Description:
+        Synchronous entry point for GenericTest methods: runs every step
+        at the same time and returns once all have finished. Each step
+        is called with the Flow, which polling steps pass on so they
+        stop early when another step fails.
+    Args:
+        steps (callable): Functions taking the Flow.
+    Returns:
+        list. What each step returned, in the order given.
+    """
+    flow = Flow(max_workers=max(1, len(steps)))
+    for step in steps:
+        flow.spawn(step, flow)
+
+    return flow.join()
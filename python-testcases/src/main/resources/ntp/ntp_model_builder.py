@@ -0,0 +1,185 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Collects LITP model changes and applies them on the MS in a
+            single remote session
+"""
+from litp_cli_utils import CLIUtils
+import test_constants as const
+from ntp_model_index import MODEL_INDEX
+from ntp_timing import timed
+
+
+class ModelBuilder(object):
+    """
+    Declares a set of create, inherit, update, remove and load
+    operations and applies them with one run_command on the MS, instead
+    of one SSH session and one assert cycle per litp command.
+
+    Items created or inherited with add_to_cleanup=True are removed
+    again when the test finishes, in reverse order, followed by a plan
+    if the removal left anything to apply.
+    """
+
+    def __init__(self, test, ms_node, plan_timeout_mins=10):
+        """
+        Args:
+            test (GenericTest): Test instance used to run the commands.
+            ms_node (str): Management server filename.
+            plan_timeout_mins (int): Timeout of the cleanup plan.
+        """
+        self.test = test
+        self.ms_node = ms_node
+        self.plan_timeout_mins = plan_timeout_mins
+        self.cli = CLIUtils()
+        self._cmds = []
+        self._changed_urls = []
+        self._removed_urls = []
+        self._cleanup_urls = []
+
+    def create(self, url, class_type, props='', add_to_cleanup=False):
+        """
+        Description:
+            Queues a litp create command.
+        Args:
+            url (str): Path of the item to create.
+            class_type (str): Item type.
+            props (str): Properties, e.g. "server=1.2.3.4".
+            add_to_cleanup (bool): Remove the item after the test.
+        Returns:
+            ModelBuilder. self, so calls can be chained.
+        """
+        self._cmds.append(self.cli.get_create_cmd(url, class_type, props))
+        self._changed_urls.append(url)
+        if add_to_cleanup:
+            self._cleanup_urls.append(url)
+
+        return self
+
+    def inherit(self, url, source_path, props='', add_to_cleanup=False):
+        """
+        Description:
+            Queues a litp inherit command.
+        Args:
+            url (str): Path of the inherited item.
+            source_path (str): Path of the source item.
+            props (str): Properties overridden on the inherited item.
+            add_to_cleanup (bool): Remove the item after the test.
+        Returns:
+            ModelBuilder. self, so calls can be chained.
+        """
+        self._cmds.append(self.cli.get_inherit_cmd(url, source_path, props))
+        self._changed_urls.append(url)
+        if add_to_cleanup:
+            self._cleanup_urls.append(url)
+
+        return self
+
+    def update(self, url, props):
+        """
+        Description:
+            Queues a litp update command.
+        Args:
+            url (str): Path of the item to update.
+            props (str): Properties to set.
+        Returns:
+            ModelBuilder. self, so calls can be chained.
+        """
+        self._cmds.append(self.cli.get_update_cmd(url, props))
+
+        return self
+
+    def remove(self, url):
+        """
+        Description:
+            Queues a litp remove command.
+        Args:
+            url (str): Path of the item to remove.
+        Returns:
+            ModelBuilder. self, so calls can be chained.
+        """
+        self._cmds.append(self.cli.get_remove_cmd(url))
+        self._removed_urls.append(url)
+
+        return self
+
+    def load(self, url, filepath, args='--merge'):
+        """
+        Description:
+            Queues a litp load of an XML export.
+        Args:
+            url (str): Path to load the exported items under.
+            filepath (str): XML file on the MS.
+            args (str): '--merge' or '--replace'.
+        Returns:
+            ModelBuilder. self, so calls can be chained.
+        """
+        self._cmds.append(self.cli.get_xml_load_cmd(url, filepath, args))
+        self._changed_urls.append(url)
+
+        return self
+
+    def pending(self):
+        """
+        Returns:
+            int. Number of queued commands not applied yet.
+        """
+        return len(self._cmds)
+
+    def apply(self):
+        """
+        Description:
+            Runs every queued command, in order, in one remote shell on
+            the MS. The shell stops at the first failing command and
+            the test fails with its output.
+        """
+        if not self._cmds:
+            return
+        cmds, self._cmds = self._cmds, []
+        for url in self._changed_urls:
+            MODEL_INDEX.invalidate(url)
+        for url in self._removed_urls:
+            MODEL_INDEX.mark_removed(url)
+        self._changed_urls, self._removed_urls = [], []
+        with timed("cli", self.ms_node,
+                   "batch of {0} litp commands".format(len(cmds))):
+            std_out, std_err, exit_code = self.test.run_command(
+                self.ms_node, " && ".join(cmds), default_asserts=False)
+        self.test.assertEqual(0, exit_code,
+                              "Batch of {0} litp commands failed:\n{1}\n{2}"
+                              .format(len(cmds), "\n".join(std_out),
+                                      "\n".join(std_err)))
+
+        if self._cleanup_urls:
+            urls, self._cleanup_urls = self._cleanup_urls, []
+            self.test.addCleanup(self._cleanup, urls)
+
+    def _cleanup(self, urls):
+        """
+        Description:
+            Removes items registered for cleanup, newest first. Each
+            remove is independent so an item the test already removed
+            does not stop the others. A plan is run only if the
+            removals left tasks to apply.
+        Args:
+            urls (list): Paths registered with add_to_cleanup.
+        """
+        cmds = [self.cli.get_remove_cmd(url) for url in reversed(urls)]
+        for url in urls:
+            MODEL_INDEX.mark_removed(url)
+        self.test.run_command(self.ms_node, "; ".join(cmds),
+                              default_asserts=False)
+        exit_code = self.test.run_command(
+            self.ms_node, self.cli.get_create_plan_cmd(),
+            default_asserts=False)[2]
+        if exit_code == 0:
+            self.test.execute_cli_runplan_cmd(self.ms_node)
+            self.test.assertTrue(self.test.wait_for_plan_state(
+                self.ms_node, const.PLAN_COMPLETE, self.plan_timeout_mins),
+                "Cleanup plan was not successful")
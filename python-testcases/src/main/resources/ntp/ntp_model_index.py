@@ -0,0 +1,210 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Session wide cache of LITP model find() lookups, invalidated
+            per subtree when the model changes
+"""
+import threading
+
+
+class ModelIndex(object):
+    """
+    Remembers the answer of every find() query for the whole test
+    session. An entry is dropped when an item is created, inherited or
+    removed in the subtree it covers, or once a plan completes after an
+    item in that subtree was marked for removal.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending_removals = set()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key, loader):
+        """
+        Description:
+            Returns the cached answer for key, calling loader on a miss.
+        Args:
+            key (tuple): (node, path, ...) of the find() call.
+            loader (callable): Runs the real find.
+        Returns:
+            list. Paths found.
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                return list(self._entries[key])
+        result = loader()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = list(result)
+
+        return result
+
+    def invalidate(self, url):
+        """
+        Description:
+            Drops every entry whose search path contains url or lies
+            under it.
+        Args:
+            url (str): Model path that changed.
+        """
+        url = url.rstrip('/') or '/'
+        with self._lock:
+            for key in list(self._entries):
+                path = key[1].rstrip('/') or '/'
+                if _is_under(url, path) or _is_under(path, url):
+                    del self._entries[key]
+
+    def mark_removed(self, url):
+        """
+        Description:
+            Records a removal. The item stays in the model until a plan
+            has run, so the subtree is dropped again at plan completion.
+        Args:
+            url (str): Model path marked ForRemoval.
+        """
+        self.invalidate(url)
+        with self._lock:
+            self._pending_removals.add(url)
+
+    def plan_completed(self):
+        """
+        Description:
+            Drops the subtrees of every removal done since the last
+            plan.
+        """
+        with self._lock:
+            removed, self._pending_removals = self._pending_removals, set()
+        for url in removed:
+            self.invalidate(url)
+
+    def clear(self):
+        """
+        Drops every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._pending_removals.clear()
+
+
+def _is_under(path, ancestor):
+    """
+    Returns True when path is ancestor or lies below it.
+    """
+    return ancestor == '/' or path == ancestor or \
+        path.startswith(ancestor + '/')
+
+
+MODEL_INDEX = ModelIndex()
+
+
+class ModelIndexMixin(object):
+    """
+    Mixin for GenericTest subclasses that answers find() from the
+    session wide MODEL_INDEX and keeps it up to date when the test
+    changes the model through the execute_cli_*_cmd methods.
+    ntp_base.NtpGenericTest sets its place among the other mixins.
+    """
+
+    model_index = MODEL_INDEX
+
+    def tearDown(self):
+        """
+        Description:
+            Lets GenericTest clean up, then drops the cached lookups
+            for every item the test registered for cleanup.
+        """
+        super(ModelIndexMixin, self).tearDown()
+        for url in getattr(self, '_model_cleanup_urls', []):
+            self.model_index.invalidate(url)
+        self._model_cleanup_urls = []
+        self.model_index.plan_completed()
+
+    def _track_cleanup(self, url, kwargs):
+        """
+        Remembers url when GenericTest will remove it at teardown.
+        """
+        if kwargs.get('add_to_cleanup', True):
+            if not hasattr(self, '_model_cleanup_urls'):
+                self._model_cleanup_urls = []
+            self._model_cleanup_urls.append(url)
+
+    def find(self, node, path, resource, rtype_option=True,
+             assert_not_empty=True, **kwargs):
+        """
+        Description:
+            Cached equivalent of GenericTest.find.
+        """
+        key = (node, path, resource, rtype_option,
+               tuple(sorted(kwargs.items())))
+        result = self.model_index.lookup(
+            key, lambda: super(ModelIndexMixin, self).find(
+                node, path, resource, rtype_option, False, **kwargs))
+        if assert_not_empty:
+            self.assertNotEqual([], result,
+                                "No {0} found under {1}".format(resource,
+                                                                path))
+
+        return result
+
+    def execute_cli_create_cmd(self, node, url, *args, **kwargs):
+        """
+        Description:
+            Creates the item and drops the affected cached lookups.
+        """
+        self.model_index.invalidate(url)
+        self._track_cleanup(url, kwargs)
+        return super(ModelIndexMixin, self).execute_cli_create_cmd(
+            node, url, *args, **kwargs)
+
+    def execute_cli_inherit_cmd(self, node, url, *args, **kwargs):
+        """
+        Description:
+            Inherits the item and drops the affected cached lookups.
+        """
+        self.model_index.invalidate(url)
+        self._track_cleanup(url, kwargs)
+        return super(ModelIndexMixin, self).execute_cli_inherit_cmd(
+            node, url, *args, **kwargs)
+
+    def execute_cli_remove_cmd(self, node, url, *args, **kwargs):
+        """
+        Description:
+            Removes the item and drops the affected cached lookups,
+            now and again once the next plan completes.
+        """
+        self.model_index.mark_removed(url)
+        return super(ModelIndexMixin, self).execute_cli_remove_cmd(
+            node, url, *args, **kwargs)
+
+    def wait_for_plan_state(self, *args, **kwargs):
+        """
+        Description:
+            Waits for the plan and applies pending removals to the
+            cache.
+        """
+        result = super(ModelIndexMixin, self).wait_for_plan_state(
+            *args, **kwargs)
+        self.model_index.plan_completed()
+
+        return result
+
+    def run_and_check_plan(self, *args, **kwargs):
+        """
+        Description:
+            Runs the plan and applies pending removals to the cache.
+        """
+        result = super(ModelIndexMixin, self).run_and_check_plan(
+            *args, **kwargs)
+        self.model_index.plan_completed()
+
+        return result
@@ -0,0 +1,119 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Helpers used by the NTP testsets to run the same check on
+            several nodes at once with a bounded pool of worker threads
+"""
+import sys
+import threading
+from collections import namedtuple
+
+DEFAULT_MAX_WORKERS = 8
+
+NodeResult = namedtuple('NodeResult', ['node', 'stdout', 'stderr', 'rc'])
+
+
+def run_on_nodes(func, nodes, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Description:
+        Calls func(node) for every node, running at most max_workers
+        calls at the same time.
+    Args:
+        func (callable): Function taking a node filename.
+        nodes (list): Node filenames to run func against.
+        max_workers (int): Upper bound on concurrent calls.
+    Returns:
+        list. One (node, value, exc_info) tuple per node in the order
+        the nodes were given. exc_info is None when func returned and
+        value is None when func raised.
+    """
+    nodes = list(nodes)
+    results = [None] * len(nodes)
+    pending = list(range(len(nodes)))
+    lock = threading.Lock()
+
+    def worker():
+        """
+        Takes node indexes off the shared list until it is empty.
+        """
+        while True:
+            with lock:
+                if not pending:
+                    return
+                index = pending.pop(0)
+            node = nodes[index]
+            try:
+                results[index] = (node, func(node), None)
+            except Exception:  # pylint: disable=broad-except
+                results[index] = (node, None, sys.exc_info())
+
+    workers = [threading.Thread(target=worker)
+               for _ in range(max(1, min(max_workers, len(nodes))))]
+    for thread in workers:
+        thread.daemon = True
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return results
+
+
+def run_command_on_nodes(test, nodes, cmd, max_workers=DEFAULT_MAX_WORKERS,
+                         **kwargs):
+    """
+    Description:
+        Sends the same command to every node concurrently and gathers
+        the output of each one. Asserts are never made per node; the
+        caller decides what a failure is and reports all of them at
+        once.
+    Args:
+        test (GenericTest): Test instance used to run the commands.
+        nodes (list): Node filenames to run the command on.
+        cmd (str): Command to run.
+        max_workers (int): Upper bound on concurrent SSH sessions.
+        kwargs: Passed through to run_command.
+    Returns:
+        list. One NodeResult per node, in node order. When run_command
+        raises, rc is None and stderr holds the exception text.
+    """
+    kwargs['default_asserts'] = False
+
+    def run(node):
+        """
+        Runs cmd on a single node.
+        """
+        return test.run_command(node, cmd, **kwargs)
+
+    node_results = []
+    for node, value, exc_info in run_on_nodes(run, nodes, max_workers):
+        if exc_info is not None:
+            node_results.append(
+                NodeResult(node, [], [str(exc_info[1])], None))
+        else:
+            std_out, std_err, exit_code = value
+            node_results.append(
+                NodeResult(node, std_out, std_err, exit_code))
+
+    return node_results
+
+
+def format_node_failures(failures):
+    """
+    Description:
+        Builds a single assertion message covering every failing node.
+    Args:
+        failures (list): (node, reason) tuples.
+    Returns:
+        str. Report with one line per failing node.
+    """
+    lines = ["{0} node(s) failed verification:".format(len(failures))]
+    for node, reason in failures:
+        lines.append("  {0}: {1}".format(node, reason))
+
+    return "\n".join(lines)
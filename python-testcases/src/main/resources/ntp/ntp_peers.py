@@ -0,0 +1,212 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Collects the ntpq peer tables of several nodes into one
+            table of offset, jitter, delay, reach and stratum columns
+"""
+from array import array
+from collections import namedtuple
+from ntp_parallel import run_command_on_nodes, format_node_failures
+from ntp_stats import summary
+from ntp_timing import timed
+
+NTPQ_CMD = "/usr/sbin/ntpq -pn"
+NUMERIC_COLUMNS = ("stratum", "reach", "delay", "offset", "jitter")
+# ntpd steps the clock rather than slewing it above this offset
+STEP_THRESHOLD_MS = 128.0
+
+PeerKey = namedtuple('PeerKey', ['node', 'remote', 'refid', 'tally'])
+
+
+def parse_ntpq_peers(lines):
+    """
+    Description:
+        Parses the output of 'ntpq -pn'. Addresses too long for the
+        remote column make ntpq wrap the rest of the row onto the next
+        line; such rows are joined back together.
+    Args:
+        lines (list): Output lines of ntpq -pn.
+    Returns:
+        list. (tally, remote, refid, stratum, reach, delay, offset,
+        jitter) per peer. Reach is the decimal value of the octal
+        register, delay, offset and jitter are in milliseconds.
+    """
+    peers = []
+    pending = None
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("remote") or \
+                line.startswith("="):
+            continue
+        if pending is not None:
+            line = pending + " " + line.strip()
+            pending = None
+        tally = line[0] if line[0] != " " else ""
+        fields = line[1:].split()
+        if len(fields) == 1:
+            pending = line
+            continue
+        if len(fields) < 10:
+            continue
+        remote, refid, stratum, _, _, _, reach, delay, offset, jitter = \
+            fields[:10]
+        peers.append((tally, remote, refid, int(stratum), int(reach, 8),
+                      float(delay), float(offset), float(jitter)))
+
+    return peers
+
+
+class PeerTable(object):
+    """
+    One row per (node, peer) with the numeric columns held in flat
+    arrays, so statistics over hundreds of nodes are a single pass over
+    a column rather than a walk through per node structures.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.columns = dict((name, array('d')) for name in NUMERIC_COLUMNS)
+
+    def add(self, node, peers):
+        """
+        Description:
+            Appends the peers of a node.
+        Args:
+            node (str): Node filename.
+            peers (list): Rows from parse_ntpq_peers.
+        """
+        for tally, remote, refid, stratum, reach, delay, offset, jitter \
+                in peers:
+            self.keys.append(PeerKey(node, remote, refid, tally))
+            for name, value in zip(NUMERIC_COLUMNS,
+                                   (stratum, reach, delay, offset, jitter)):
+                self.columns[name].append(value)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rows(self, predicate=None):
+        """
+        Description:
+            Selects rows by their key.
+        Args:
+            predicate (function): Called with a PeerKey, selects the row
+                                  when it returns True. All rows when
+                                  None.
+        Returns:
+            list. Row indexes.
+        """
+        return [index for index, key in enumerate(self.keys)
+                if predicate is None or predicate(key)]
+
+    def values(self, column, rows=None):
+        """
+        Description:
+            Returns the values of a column.
+        Args:
+            column (str): One of NUMERIC_COLUMNS.
+            rows (list): Row indexes, all rows when None.
+        Returns:
+            list. Column values.
+        """
+        values = self.columns[column]
+        if rows is None:
+            return list(values)
+
+        return [values[index] for index in rows]
+
+    def stats(self, column, rows=None, absolute=False):
+        """
+        Description:
+            Summary statistics of a column.
+        Args:
+            column (str): One of NUMERIC_COLUMNS.
+            rows (list): Row indexes, all rows when None.
+            absolute (bool): Use absolute values, for offsets.
+        Returns:
+            dict. As returned by ntp_stats.summary.
+        """
+        values = self.values(column, rows)
+        if absolute:
+            values = [abs(value) for value in values]
+
+        return summary(values)
+
+    def violations(self, column, limit, rows=None, absolute=True):
+        """
+        Description:
+            Finds rows whose value is above a limit.
+        Args:
+            column (str): One of NUMERIC_COLUMNS.
+            limit (float): Highest allowed value.
+            rows (list): Row indexes, all rows when None.
+            absolute (bool): Compare absolute values, for offsets.
+        Returns:
+            list. (node, reason) tuples for format_node_failures.
+        """
+        if rows is None:
+            rows = range(len(self.keys))
+        values = self.columns[column]
+        failures = []
+        for index in rows:
+            value = abs(values[index]) if absolute else values[index]
+            if value > limit:
+                failures.append((self.keys[index].node,
+                                 "{0} {1} of peer {2} is above {3}".format(
+                                     column, values[index],
+                                     self.keys[index].remote, limit)))
+
+        return failures
+
+    def report(self):
+        """
+        Returns:
+            str. Offset, jitter and delay statistics over all rows.
+        """
+        lines = ["{0} peer(s) on {1} node(s)".format(
+            len(self.keys), len(set(key.node for key in self.keys)))]
+        for column, absolute in (("offset", True), ("jitter", False),
+                                 ("delay", False)):
+            stats = self.stats(column, absolute=absolute)
+            lines.append("{0}: min {1:.3f} p50 {2:.3f} p95 {3:.3f} "
+                         "max {4:.3f} ms".format(
+                             "|offset|" if absolute else column,
+                             stats["min"], stats["p50"], stats["p95"],
+                             stats["max"]))
+
+        return "\n".join(lines)
+
+
+def collect_peer_table(test, nodes, cmd=NTPQ_CMD):
+    """
+    Description:
+        Runs ntpq on every node concurrently and builds one PeerTable.
+        Fails the test with one report listing every node where ntpq
+        could not be run.
+    Args:
+        test (GenericTest): Test instance used to run the commands.
+        nodes (list): Node filenames to query.
+        cmd (str): ntpq command printing the peer table.
+    Returns:
+        PeerTable. Peers of all nodes.
+    """
+    table = PeerTable()
+    failures = []
+    with timed("ntpq", ",".join(nodes), cmd):
+        results = run_command_on_nodes(test, nodes, cmd)
+    for result in results:
+        if result.rc != 0:
+            failures.append((result.node, "{0} failed: rc={1}, stderr={2}"
+                             .format(cmd, result.rc, result.stderr)))
+        else:
+            table.add(result.node, parse_ntpq_peers(result.stdout))
+
+    test.assertEqual([], failures, format_node_failures(failures))
+    test.log("info", "ntpq peers:\n{0}".format(table.report()))
+
+    return table
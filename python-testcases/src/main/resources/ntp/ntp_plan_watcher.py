@@ -0,0 +1,215 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Follows the task state transitions of a running LITP plan
+            and reports how long each task, phase and node took
+"""
+import re
+import time
+from litp_cli_utils import CLIUtils
+from ntp_model_index import MODEL_INDEX
+from ntp_timing import timed
+
+TERMINAL_PLAN_STATES = ('Successful', 'Failed', 'Stopped')
+FINISHED_TASK_STATES = ('Success', 'Failed', 'Stopped')
+
+PHASE_RE = re.compile(r'^Phase (\d+)')
+TASK_RE = re.compile(r'^(Initial|Running|Success|Failed|Stopped)\s+(/\S*)')
+PLAN_STATUS_RE = re.compile(r'^Plan Status:\s*(\w+)')
+NODE_RE = re.compile(r'/nodes/([^/]+)')
+
+
+def parse_show_plan(lines):
+    """
+    Description:
+        Parses the output of litp show_plan.
+    Args:
+        lines (list): Output lines of show_plan.
+    Returns:
+        tuple. (plan state, list of (phase, path, description, status))
+    """
+    plan_state = None
+    tasks = []
+    phase = 0
+    task = None
+    for line in lines:
+        match = PHASE_RE.match(line)
+        if match:
+            phase = int(match.group(1))
+            continue
+        match = TASK_RE.match(line)
+        if match:
+            task = [phase, match.group(2), '', match.group(1)]
+            tasks.append(task)
+            continue
+        match = PLAN_STATUS_RE.match(line)
+        if match:
+            plan_state = match.group(1)
+            continue
+        if task is not None and line.startswith((' ', '\t')) and \
+                not task[2]:
+            task[2] = line.strip()
+
+    return plan_state, [tuple(task) for task in tasks]
+
+
+def task_node(path):
+    """
+    Description:
+        Returns the node a task runs against, taken from its model path.
+    Args:
+        path (str): Model path of the task.
+    Returns:
+        str. Node item id, 'ms' or the path itself.
+    """
+    if path == '/ms' or path.startswith('/ms/'):
+        return 'ms'
+    match = NODE_RE.search(path)
+
+    return match.group(1) if match else path
+
+
+class PlanTimings(object):
+    """
+    Durations gathered while watching a plan. Tasks that were never
+    seen running are timed from the first poll that showed them
+    finished, so very short tasks report a duration close to zero.
+    ended is the epoch time the plan was first seen in a terminal
+    state, the point from which configuration changes are in effect.
+    """
+
+    def __init__(self):
+        self.state = None
+        self.started = {}
+        self.finished = {}
+        self.status = {}
+        self.elapsed = 0.0
+        self.ended = None
+
+    def task_durations(self):
+        """
+        Returns:
+            dict. Seconds per (phase, path, description) task.
+        """
+        return dict((task, self.finished[task] - self.started[task])
+                    for task in self.finished if task in self.started)
+
+    def _span(self, group):
+        """
+        Returns the wall time covered by the tasks of each group.
+        """
+        spans = {}
+        for task in self.finished:
+            if task not in self.started:
+                continue
+            key = group(task)
+            start, end = spans.get(key, (self.started[task],
+                                         self.finished[task]))
+            spans[key] = (min(start, self.started[task]),
+                          max(end, self.finished[task]))
+
+        return dict((key, end - start) for key, (start, end)
+                    in spans.items())
+
+    def phase_durations(self):
+        """
+        Returns:
+            dict. Seconds per phase number.
+        """
+        return self._span(lambda task: task[0])
+
+    def node_durations(self):
+        """
+        Returns:
+            dict. Seconds per node, from its first task starting to its
+            last task finishing.
+        """
+        return self._span(lambda task: task_node(task[1]))
+
+    def report(self):
+        """
+        Returns:
+            str. Per task, per phase and per node durations.
+        """
+        lines = ["Plan {0} after {1:.1f}s".format(self.state, self.elapsed)]
+        for phase, duration in sorted(self.phase_durations().items()):
+            lines.append("  phase {0}: {1:.1f}s".format(phase, duration))
+        for task, duration in sorted(self.task_durations().items()):
+            lines.append("    {0:.1f}s {1} {2} [{3}]".format(
+                duration, task[1], task[2], self.status[task]))
+        for node, duration in sorted(self.node_durations().items()):
+            lines.append("  node {0}: {1:.1f}s".format(node, duration))
+
+        return "\n".join(lines)
+
+
+def watch_plan(test, ms_node, timeout_mins, poll_interval=2):
+    """
+    Description:
+        Polls show_plan, recording when each task starts and finishes,
+        and returns as soon as the plan reaches a terminal state.
+    Args:
+        test (GenericTest): Test instance used to run the commands.
+        ms_node (str): Management server filename.
+        timeout_mins (int): Give up after this many minutes.
+        poll_interval (int): Seconds between show_plan calls.
+    Returns:
+        PlanTimings. Final plan state and the recorded durations. The
+        state is None if the plan did not finish in time.
+    """
+    cmd = CLIUtils().get_show_plan_cmd()
+    timings = PlanTimings()
+    start = time.time()
+    deadline = start + timeout_mins * 60
+    while True:
+        std_out = test.run_command(ms_node, cmd, default_asserts=False)[0]
+        now = time.time()
+        plan_state, tasks = parse_show_plan(std_out)
+        for phase, path, description, status in tasks:
+            task = (phase, path, description)
+            timings.status[task] = status
+            if status != 'Initial':
+                timings.started.setdefault(task, now)
+            if status in FINISHED_TASK_STATES:
+                timings.finished.setdefault(task, now)
+        timings.elapsed = now - start
+        if plan_state in TERMINAL_PLAN_STATES:
+            timings.state = plan_state
+            timings.ended = now
+            break
+        if now >= deadline:
+            break
+        time.sleep(poll_interval)
+
+    MODEL_INDEX.plan_completed()
+    test.log("info", timings.report())
+
+    return timings
+
+
+def run_and_watch_plan(test, ms_node, timeout_mins):
+    """
+    Description:
+        Creates and runs a plan, watches it to completion and fails the
+        test unless it is successful.
+    Args:
+        test (GenericTest): Test instance used to run the commands.
+        ms_node (str): Management server filename.
+        timeout_mins (int): Timeout of the plan.
+    Returns:
+        PlanTimings. Durations recorded while the plan ran.
+    """
+    with timed("plan", ms_node, "run_and_watch_plan"):
+        test.execute_cli_createplan_cmd(ms_node)
+        test.execute_cli_runplan_cmd(ms_node)
+        timings = watch_plan(test, ms_node, timeout_mins)
+    test.assertEqual('Successful', timings.state,
+                     "Plan was not successful\n{0}".format(timings.report()))
+
+    return timings
@@ -0,0 +1,271 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Checks the NTP prerequisites of the deployment once per
+            session, so a broken one fails or skips cases in seconds
+            instead of after their sync timeouts
+
+Set NTP_PREFLIGHT=0 to turn the checks off.
+"""
+import os
+import re
+import threading
+import unittest
+from collections import namedtuple
+from ntp_conf_parser import ADDRESS_ENTRIES, DirectiveEntry
+from ntp_conf_snapshot import NtpConfSnapshot
+from ntp_deployment import get_deployment
+from ntp_parallel import run_on_nodes, format_node_failures
+from ntp_responder import external_server
+from ntp_timing import timed
+
+PREFLIGHT_ENV = "NTP_PREFLIGHT"
+NTPD_RUNNING_CMD = "/usr/bin/pgrep -x ntpd"
+RESOLVE_CMD = "/usr/bin/getent hosts {0}"
+# One query, unprivileged port so it works next to a running ntpd
+NTP_QUERY_CMD = "/usr/sbin/ntpdate -q -u -p 1 -t 2 {0}"
+IP_ADDRESS = re.compile(r"^[0-9.]+$|:")
+# Reference clock drivers are not queried over the network
+REFCLOCK_PREFIX = "127.127."
+# Exit code of the shell when the command is not installed
+NOT_INSTALLED = 127
+
+CheckResult = namedtuple('CheckResult', ['check', 'node', 'target',
+                                         'reason'])
+
+_LOCK = threading.Lock()
+_DEPLOYMENT_FAILURES = []
+_SERVER_FAILURES = {}
+
+
+def preflight_enabled():
+    """
+    Returns:
+        bool. False when NTP_PREFLIGHT is set to 0 or empty.
+    """
+    return os.environ.get(PREFLIGHT_ENV, "1") not in ("", "0")
+
+
+def ntp_conf_problems(ntp_conf):
+    """
+    Description:
+        Finds what would stop ntpd from using an ntp.conf.
+    Args:
+        ntp_conf (NtpConf): Parsed file.
+    Returns:
+        list. Problem descriptions, empty when the file is usable.
+    """
+    problems = []
+    if not ntp_conf.entries:
+        problems.append("file is empty")
+    elif not ntp_conf.servers():
+        problems.append("no server lines")
+    for entry in ntp_conf.entries:
+        if isinstance(entry, DirectiveEntry) and \
+                entry.directive in tuple(ADDRESS_ENTRIES) + ("driftfile",):
+            problems.append("line {0}: '{1}' without an argument".format(
+                entry.line_no, entry.directive))
+
+    return problems
+
+
+def _command_check(test, check, node, target, cmd, optional=False):
+    """
+    Returns a function running cmd on node that gives a CheckResult
+    list, empty when cmd succeeds. An optional check is skipped when
+    cmd is not installed on node.
+    """
+    def run():
+        """
+        Runs the check command.
+        """
+        std_out, std_err, exit_code = test.run_command(
+            node, cmd, default_asserts=False, logging=False)
+        if exit_code == 0:
+            return []
+        if optional and exit_code == NOT_INSTALLED:
+            test.log("info", "Preflight: {0} check of {1} skipped on {2}, "
+                     "'{3}' is not installed".format(check, target, node,
+                                                     cmd.split()[0]))
+            return []
+        reason = "'{0}' returned {1}".format(cmd, exit_code)
+        output = " ".join(std_err + std_out)
+        if output:
+            reason += ": " + output[:200]
+        return [CheckResult(check, node, target, reason)]
+
+    return run
+
+
+def _server_check(test, node, server):
+    """
+    Returns a function resolving server on node, unless it is an
+    address, and sending it one NTP query when ntpdate is installed.
+    """
+    def run():
+        """
+        Resolves and queries the server.
+        """
+        if not IP_ADDRESS.search(server):
+            failed = _command_check(test, "resolve", node, server,
+                                    RESOLVE_CMD.format(server))()
+            if failed:
+                return failed
+        return _command_check(test, "ntp query", node, server,
+                              NTP_QUERY_CMD.format(server), optional=True)()
+
+    return run
+
+
+def _ntp_conf_check(test, nodes):
+    """
+    Returns a function reading and checking ntp.conf on every node.
+    """
+    def run():
+        """
+        Parses ntp.conf of every node.
+        """
+        ntp_conf = NtpConfSnapshot(test)
+        ntp_conf.refresh(nodes)
+        return [CheckResult("ntp.conf", node, "/etc/ntp.conf", problem)
+                for node in nodes
+                for problem in ntp_conf_problems(ntp_conf.parsed(node))]
+
+    return run
+
+
+def _run_checks(checks):
+    """
+    Runs check functions concurrently and returns their failures.
+    """
+    failures = []
+    for _, found, exc_info in run_on_nodes(lambda check: check(), checks,
+                                           max_workers=len(checks)):
+        if exc_info is not None:
+            failures.append(CheckResult("preflight", None, None,
+                                        str(exc_info[1])))
+        else:
+            failures.extend(found)
+
+    return failures
+
+
+def deployment_failures(test):
+    """
+    Description:
+        Checks, on the first call of the session only, that ntpd runs
+        on every node, that ntp.conf of every node is usable and that
+        every peer node gets an answer to an NTP query to the MS.
+    Args:
+        test (GenericTest): Test instance used to run the commands.
+    Returns:
+        list. CheckResult per failed check.
+    """
+    with _LOCK:
+        if not _DEPLOYMENT_FAILURES:
+            deployment = get_deployment(test)
+            checks = [_command_check(test, "ntpd", node, "ntpd",
+                                     NTPD_RUNNING_CMD)
+                      for node in deployment.all_nodes]
+            checks += [_server_check(test, node, deployment.ms_ip)
+                       for node in deployment.peer_nodes]
+            checks.append(_ntp_conf_check(test, deployment.all_nodes))
+            with timed("preflight", deployment.ms_node, "deployment"):
+                _DEPLOYMENT_FAILURES.append(_run_checks(checks))
+        return _DEPLOYMENT_FAILURES[0]
+
+
+def server_failures(test, servers):
+    """
+    Description:
+        Checks that the MS resolves and gets an answer from every
+        server. Each server is checked once per session.
+    Args:
+        test (GenericTest): Test instance used to run the commands.
+        servers (list): Server names or addresses.
+    Returns:
+        list. CheckResult per failed check.
+    """
+    ms_node = get_deployment(test).ms_node
+    with _LOCK:
+        unchecked = [server for server in servers
+                     if server not in _SERVER_FAILURES and
+                     not server.startswith(REFCLOCK_PREFIX)]
+        if unchecked:
+            with timed("preflight", ms_node, " ".join(unchecked)):
+                failures = _run_checks([_server_check(test, ms_node, server)
+                                        for server in unchecked])
+            for server in unchecked:
+                _SERVER_FAILURES[server] = [failure for failure in failures
+                                            if failure.target == server]
+
+    return [failure for server in servers
+            for failure in _SERVER_FAILURES.get(server, [])]
+
+
+def format_check_failures(failures):
+    """
+    Description:
+        Builds the report of failed checks.
+    Args:
+        failures (list): CheckResult tuples.
+    Returns:
+        str. One line per failed check.
+    """
+    return "Preflight: " + format_node_failures(
+        [(failure.node, "{0} {1}: {2}".format(failure.check, failure.target,
+                                              failure.reason))
+         for failure in failures])
+
+
+class PreflightMixin(object):
+    """
+    Mixin for GenericTest subclasses that runs the preflight checks in
+    setUp. A broken deployment fails every case at once. A case that
+    needs external servers, listed in its ntp_servers attribute, is
+    skipped when the MS cannot resolve or reach one of them, or the
+    responder standing in for them. ntp_base.NtpGenericTest sets its
+    place among the other mixins.
+    """
+
+    def setUp(self):
+        """
+        Description:
+            Fails or skips the case when a prerequisite is broken.
+        """
+        super(PreflightMixin, self).setUp()
+        if not preflight_enabled():
+            return
+        failures = deployment_failures(self)
+        if failures:
+            self._release()
+            self.fail(format_check_failures(failures))
+        servers = getattr(getattr(self, self._testMethodName),
+                          'ntp_servers', None)
+        if servers:
+            try:
+                servers = [external_server(server) for server in servers]
+            except unittest.SkipTest:
+                self._release()
+                raise
+            failures = server_failures(self, servers)
+            if failures:
+                self._release()
+                self.skipTest(format_check_failures(failures))
+
+    def _release(self):
+        """
+        Tears down the classes set up after this one. unittest does not
+        call tearDown when setUp fails or skips.
+        """
+        try:
+            super(PreflightMixin, self).tearDown()
+        except Exception as error:  # pylint: disable=broad-except
+            self.log("warning", "Preflight: tearDown failed: {0}"
+                     .format(error))
@@ -0,0 +1,201 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Opt-in cProfile and tracemalloc profiling of every test case,
+            to tell harness overhead apart from waiting on the deployment
+
+Usage:
+    NTP_PROFILE=1 nosetests -v testset_story220.py
+    python ntp_profile.py ntp_profiles
+
+With NTP_PROFILE set every case writes <class>.<test>.prof, loadable
+with pstats, and <class>.<test>.txt to NTP_PROFILE_DIR. The text file
+holds the wall and CPU time of the case, the top functions by own time
+and, on Python 3, the lines that allocated most memory. The command
+line merges the profiles of a directory into one hotspot summary.
+
+Only the thread running the test is profiled, so time spent in worker
+threads shows up as waiting in the thread that joins them.
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+PROFILE_ENV = "NTP_PROFILE"
+PROFILE_DIR_ENV = "NTP_PROFILE_DIR"
+PROFILE_TOP_ENV = "NTP_PROFILE_TOP"
+DEFAULT_PROFILE_DIR = "ntp_profiles"
+DEFAULT_TOP = 25
+
+
+def profile_enabled():
+    """
+    Returns:
+        bool. True when NTP_PROFILE is set to something other than 0.
+    """
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+def cpu_time():
+    """
+    Returns:
+        float. User plus system CPU seconds of this process.
+    """
+    times = os.times()
+
+    return times[0] + times[1]
+
+
+def format_stats(stats, top):
+    """
+    Description:
+        Renders the functions with the most own time.
+    Args:
+        stats (pstats.Stats): Profile statistics.
+        top (int): Number of functions to list.
+    Returns:
+        str. pstats listing.
+    """
+    output = StringIO()
+    stats.stream = output
+    stats.sort_stats("tottime").print_stats(top)
+
+    return output.getvalue()
+
+
+class CaseProfiler(object):
+    """
+    Profiles one test case and writes its reports.
+    """
+
+    def __init__(self, name, directory, top):
+        """
+        Args:
+            name (str): <class>.<test> name used for the report files.
+            directory (str): Directory the reports are written to.
+            top (int): Number of hotspots in the summary.
+        """
+        self.name = name
+        self.directory = directory
+        self.top = top
+        self.profile = cProfile.Profile()
+        self._wall = None
+        self._cpu = None
+        self._tracing = False
+
+    def start(self):
+        """
+        Description:
+            Starts profiling and, where available, allocation tracing.
+        """
+        if tracemalloc is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._wall = time.time()
+        self._cpu = cpu_time()
+        self.profile.enable()
+
+    def stop(self):
+        """
+        Description:
+            Stops profiling and writes the .prof and .txt reports.
+        """
+        self.profile.disable()
+        wall = time.time() - self._wall
+        cpu = cpu_time() - self._cpu
+        allocations = None
+        if self._tracing:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            allocations = (peak, snapshot.statistics("lineno")[:self.top])
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = os.path.join(self.directory, self.name)
+        self.profile.dump_stats(path + ".prof")
+        with open(path + ".txt", "w") as summary:
+            summary.write("{0}\nwall {1:.3f}s, cpu {2:.3f}s, waiting "
+                          "{3:.3f}s\n\n".format(self.name, wall, cpu,
+                                                max(0.0, wall - cpu)))
+            summary.write(format_stats(pstats.Stats(self.profile),
+                                       self.top))
+            if allocations is not None:
+                summary.write("\nPeak traced memory {0} KiB, top "
+                              "allocations:\n".format(allocations[0] // 1024))
+                for stat in allocations[1]:
+                    summary.write("{0}\n".format(stat))
+
+
+class ProfileMixin(object):
+    """
+    Mixin for GenericTest subclasses that profiles every case, setUp
+    and tearDown included, when NTP_PROFILE is set.
+    ntp_base.NtpGenericTest sets its place among the other mixins.
+    """
+
+    def run(self, result=None):
+        """
+        Description:
+            Runs the test under CaseProfiler when profiling is enabled.
+        """
+        if not profile_enabled():
+            return super(ProfileMixin, self).run(result)
+
+        profiler = CaseProfiler(
+            "{0}.{1}".format(self.__class__.__name__, self._testMethodName),
+            os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR),
+            int(os.environ.get(PROFILE_TOP_ENV, DEFAULT_TOP)))
+        profiler.start()
+        try:
+            return super(ProfileMixin, self).run(result)
+        finally:
+            profiler.stop()
+
+
+def main():
+    """
+    Description:
+        Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("directory", nargs="?", default=DEFAULT_PROFILE_DIR)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    args = parser.parse_args()
+
+    profiles = sorted(os.path.join(args.directory, name)
+                      for name in os.listdir(args.directory)
+                      if name.endswith(".prof"))
+    if not profiles:
+        print("No profiles in {0}".format(args.directory))
+        return 1
+    stats = pstats.Stats(profiles[0], stream=sys.stdout)
+    for path in profiles[1:]:
+        stats.add(path)
+    print("{0} profile(s) in {1}".format(len(profiles), args.directory))
+    stats.sort_stats("tottime").print_stats(args.top)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
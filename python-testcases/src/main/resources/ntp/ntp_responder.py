@@ -0,0 +1,307 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Minimal SNTPv4 server used in place of the external pool
+            and Cloud GW NTP servers, with a configurable stratum,
+            clock offset and response delay
+
+Usage:
+    python ntp_responder.py --stratum 2 --offset 0.050 --delay 0.200
+
+runs a responder on UDP port 123 of every address of the host, for
+example on a spare address of the MS or on the host running the tests.
+
+The testsets use it when NTP_RESPONDER lists the addresses the nodes
+reach it on. Each external server of the testsets is then replaced by
+one of those addresses. Story220 tc04 moves the MS from one external
+server to another, so it needs two addresses to see a change. With
+NTP_RESPONDER_LOCAL=1 a responder is also started in the test process
+on NTP_RESPONDER_PORT with the NTP_RESPONDER_STRATUM, _OFFSET and
+_DELAY settings. Port 123 needs root and must not be taken by ntpd;
+the cases using the responder are skipped when it cannot be bound.
+"""
+import argparse
+import os
+import socket
+import struct
+import threading
+import time
+import unittest
+
+RESPONDER_ENV = "NTP_RESPONDER"
+LOCAL_ENV = "NTP_RESPONDER_LOCAL"
+PORT_ENV = "NTP_RESPONDER_PORT"
+STRATUM_ENV = "NTP_RESPONDER_STRATUM"
+OFFSET_ENV = "NTP_RESPONDER_OFFSET"
+DELAY_ENV = "NTP_RESPONDER_DELAY"
+
+NTP_PORT = 123
+# Seconds from the NTP era (1900) to the Unix epoch
+NTP_EPOCH_OFFSET = 2208988800
+PACKET = struct.Struct("!BBbbII4sQQQQ")
+MODE_CLIENT = 3
+MODE_SERVER = 4
+LEAP_UNSYNCHRONISED = 3
+STRATUM_UNSYNCHRONISED = 16
+# About a microsecond, as log2 seconds
+PRECISION = -20
+
+# External servers of the testsets, in the order they take addresses
+# from NTP_RESPONDER
+EXTERNAL_SERVERS = ("1.ie.pool.ntp.org", "2.ie.pool.ntp.org",
+                    "172.16.30.1", "172.16.29.1")
+
+_LOCK = threading.Lock()
+_RESPONDER = []
+
+
+def to_ntp_time(unix_time):
+    """
+    Description:
+        Converts a Unix time to a 64 bit NTP timestamp.
+    Args:
+        unix_time (float): Seconds since the Unix epoch.
+    Returns:
+        int. Seconds since 1900 in 32.32 fixed point.
+    """
+    return int((unix_time + NTP_EPOCH_OFFSET) * 2 ** 32)
+
+
+def to_short(seconds):
+    """
+    Returns seconds in the 16.16 fixed point of root delay and root
+    dispersion.
+    """
+    return int(seconds * 2 ** 16) & 0xffffffff
+
+
+class SntpResponder(object):
+    """
+    Answers NTP client requests from its own clock shifted by offset.
+    Each answer is sent delay seconds after the request arrived, from
+    its own thread so a long delay does not hold up other clients.
+    """
+
+    def __init__(self, address="", port=NTP_PORT, stratum=2, offset=0.0,
+                 delay=0.0, refid="127.127.1.0"):
+        """
+        Args:
+            address (str): Address to listen on, all when empty.
+            port (int): UDP port.
+            stratum (int): Stratum announced, 16 for an unsynchronised
+                           server ntpd must not select.
+            offset (float): Seconds added to the local clock.
+            delay (float): Seconds to wait before answering.
+            refid (str): IPv4 address of the upstream for stratum 2 and
+                         above, or up to 4 letters for stratum 1.
+        """
+        self.stratum = stratum
+        self.offset = offset
+        self.delay = delay
+        self.refid = refid
+        self.requests = 0
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((address, port))
+        self.address = self._socket.getsockname()
+        self._thread = None
+
+    def _refid(self):
+        """
+        Returns the 4 byte reference id.
+        """
+        if self.stratum <= 1:
+            return self.refid.encode("ascii")[:4].ljust(4, b"\0")
+        return socket.inet_aton(self.refid)
+
+    def reply(self, request, received):
+        """
+        Description:
+            Builds the answer to a client request.
+        Args:
+            request (bytes): Request packet.
+            received (float): Unix time the request arrived.
+        Returns:
+            bytes. Reply packet, None when request is not from a client.
+        """
+        if len(request) < PACKET.size:
+            return None
+        fields = PACKET.unpack(request[:PACKET.size])
+        version = (fields[0] >> 3) & 0x7
+        if fields[0] & 0x7 != MODE_CLIENT:
+            return None
+        leap = LEAP_UNSYNCHRONISED \
+            if self.stratum >= STRATUM_UNSYNCHRONISED else 0
+        now = time.time() + self.offset
+
+        return PACKET.pack(
+            leap << 6 | version << 3 | MODE_SERVER,
+            min(self.stratum, STRATUM_UNSYNCHRONISED), fields[2], PRECISION,
+            to_short(0.01), to_short(0.01), self._refid(),
+            to_ntp_time(now - 16), fields[10],
+            to_ntp_time(received + self.offset), to_ntp_time(now))
+
+    def _answer(self, request, client, received):
+        """
+        Waits out the delay and sends the reply.
+        """
+        if self.delay:
+            time.sleep(self.delay)
+        packet = self.reply(request, received)
+        if packet is None:
+            return
+        try:
+            self._socket.sendto(packet, client)
+        except (socket.error, OSError):
+            # stopped while the answer was delayed
+            pass
+
+    def serve(self):
+        """
+        Description:
+            Answers requests until the socket is shut down.
+        """
+        while True:
+            try:
+                request, client = self._socket.recvfrom(512)
+            except (socket.error, OSError):
+                return
+            if not request:
+                return
+            received = time.time()
+            self.requests += 1
+            if self.delay:
+                answer = threading.Thread(target=self._answer,
+                                          args=(request, client, received))
+                answer.daemon = True
+                answer.start()
+            else:
+                self._answer(request, client, received)
+
+    def start(self):
+        """
+        Description:
+            Serves requests on a background thread.
+        """
+        self._thread = threading.Thread(target=self.serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Description:
+            Closes the socket, which ends serve().
+        """
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except (socket.error, OSError):
+            pass
+        self._socket.close()
+        if self._thread is not None:
+            self._thread.join(5)
+
+
+def responder_addresses():
+    """
+    Returns:
+        list. Addresses of the responder from NTP_RESPONDER, empty when
+        the external servers are used.
+    """
+    return [address.strip()
+            for address in os.environ.get(RESPONDER_ENV, "").split(",")
+            if address.strip()]
+
+
+def start_local_responder():
+    """
+    Description:
+        Starts the responder of the test process the first time it is
+        asked for, when NTP_RESPONDER_LOCAL is set to something other
+        than 0.
+    Returns:
+        SntpResponder. The running responder, None when it runs
+        elsewhere.
+    Raises:
+        unittest.SkipTest. The responder port cannot be bound.
+    """
+    if os.environ.get(LOCAL_ENV, "") in ("", "0"):
+        return None
+    port = int(os.environ.get(PORT_ENV, NTP_PORT))
+    with _LOCK:
+        if not _RESPONDER:
+            try:
+                responder = SntpResponder(
+                    port=port,
+                    stratum=int(os.environ.get(STRATUM_ENV, 2)),
+                    offset=float(os.environ.get(OFFSET_ENV, 0.0)),
+                    delay=float(os.environ.get(DELAY_ENV, 0.0)))
+            except (socket.error, OSError) as error:
+                raise unittest.SkipTest(
+                    "Cannot start the NTP responder on UDP port {0}: {1}. "
+                    "It needs root and a port ntpd does not use; run "
+                    "ntp_responder.py elsewhere and unset {2}".format(
+                        port, error, LOCAL_ENV))
+            responder.start()
+            _RESPONDER.append(responder)
+        return _RESPONDER[0]
+
+
+def external_server(server):
+    """
+    Description:
+        Returns the server the testsets should configure in place of an
+        external one: a responder address when NTP_RESPONDER is set,
+        otherwise the server itself.
+    Args:
+        server (str): One of EXTERNAL_SERVERS.
+    Returns:
+        str. Server name or address to use.
+    Raises:
+        unittest.SkipTest. The responder of the test process cannot be
+        started.
+    """
+    addresses = responder_addresses()
+    if not addresses or server not in EXTERNAL_SERVERS:
+        return server
+    start_local_responder()
+
+    return addresses[EXTERNAL_SERVERS.index(server) % len(addresses)]
+
+
+def main():
+    """
+    Description:
+        Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--address", default="",
+                        help="address to listen on, all by default")
+    parser.add_argument("--port", type=int, default=NTP_PORT)
+    parser.add_argument("--stratum", type=int, default=2)
+    parser.add_argument("--offset", type=float, default=0.0,
+                        help="seconds added to the local clock")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="seconds to wait before answering")
+    parser.add_argument("--refid", default="127.127.1.0")
+    args = parser.parse_args()
+
+    responder = SntpResponder(args.address, args.port, args.stratum,
+                              args.offset, args.delay, args.refid)
+    print("Answering NTP requests on {0}:{1}".format(*responder.address))
+    try:
+        responder.serve()
+    except KeyboardInterrupt:
+        responder.stop()
+    print("{0} request(s) answered".format(responder.requests))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
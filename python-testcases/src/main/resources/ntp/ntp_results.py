@@ -0,0 +1,228 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Appends one JSON line per finished test case to a results
+            file that LITPntpTestRunner reads while the run goes on
+
+Usage:
+    python ntp_results.py --junit partial.xml /tmp/ntp_results.jsonl
+
+converts a results file, complete or not, to JUnit XML.
+
+By default results go to /tmp/ntp_results.jsonl, which the first result
+of a session truncates, so it only ever holds one run. A file named in
+NTP_RESULTS_FILE is only appended to; whoever sets it, like
+ntp_scheduler for its deployments, starts it afresh.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import traceback
+from xml.sax.saxutils import quoteattr, escape
+
+RESULTS_FILE_ENV = "NTP_RESULTS_FILE"
+# Fixed, so it matches the default of NtpResultStream on the Java side
+DEFAULT_RESULTS_FILE = "/tmp/ntp_results.jsonl"
+
+_LOCK = threading.Lock()
+_STARTED = []
+
+
+def results_file():
+    """
+    Returns:
+        str. File results are appended to, empty to disable.
+    """
+    return os.environ.get(RESULTS_FILE_ENV, DEFAULT_RESULTS_FILE)
+
+
+def write_result(record):
+    """
+    Description:
+        Appends a record and flushes it to disk, so a reader sees every
+        finished case even if the run is killed straight after. The
+        first record of the session truncates the default file.
+    Args:
+        record (dict): Result of one case.
+    """
+    path = results_file()
+    if not path:
+        return
+    line = json.dumps(record, sort_keys=True)
+    with _LOCK:
+        fresh = not _STARTED and RESULTS_FILE_ENV not in os.environ
+        _STARTED.append(path)
+        with open(path, "w" if fresh else "a") as results:
+            results.write(line + "\n")
+            results.flush()
+            os.fsync(results.fileno())
+
+
+class _StreamingResult(object):
+    """
+    Wraps the result object of the runner, forwarding every call and
+    writing a record when the outcome of the test is reported.
+    """
+
+    def __init__(self, test, result):
+        self._test = test
+        self._result = result
+        self._start = time.time()
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+    def _write(self, status, err=None, message=None):
+        """
+        Writes the record of the wrapped test.
+        """
+        record = {"classname": "{0}.{1}".format(
+                      self._test.__class__.__module__,
+                      self._test.__class__.__name__),
+                  "name": self._test._testMethodName,
+                  "status": status,
+                  "time": round(time.time() - self._start, 3),
+                  "type": None, "message": message, "text": None}
+        if err is not None:
+            record["type"] = err[0].__name__
+            record["message"] = str(err[1])
+            record["text"] = "".join(traceback.format_exception(*err))
+        write_result(record)
+
+    def addSuccess(self, test):
+        self._write("passed")
+        self._result.addSuccess(test)
+
+    def addFailure(self, test, err):
+        self._write("failed", err)
+        self._result.addFailure(test, err)
+
+    def addError(self, test, err):
+        self._write("error", err)
+        self._result.addError(test, err)
+
+    def _forward(self, name, test, *args):
+        """
+        Passes an outcome on to the runner's result, falling back the
+        way unittest does when the result does not support it.
+        """
+        method = getattr(self._result, name, None)
+        if method is not None:
+            return method(test, *args)
+        if name == "addUnexpectedSuccess":
+            return self._result.addFailure(test, (AssertionError,
+                                                  AssertionError(), None))
+        return self._result.addSuccess(test)
+
+    def addSkip(self, test, reason):
+        self._write("skipped", message=reason)
+        self._forward("addSkip", test, reason)
+
+    def addExpectedFailure(self, test, err):
+        self._write("passed", err)
+        self._forward("addExpectedFailure", test, err)
+
+    def addUnexpectedSuccess(self, test):
+        self._write("failed", message="unexpected success")
+        self._forward("addUnexpectedSuccess", test)
+
+
+class ResultStreamMixin(object):
+    """
+    Mixin for GenericTest subclasses that streams the outcome of every
+    case to the results file as soon as it is known, whichever runner
+    runs the tests.
+    """
+
+    def run(self, result=None):
+        """
+        Description:
+            Runs the test with a result wrapper that records its
+            outcome.
+        """
+        if result is None or not results_file():
+            return super(ResultStreamMixin, self).run(result)
+
+        return super(ResultStreamMixin, self).run(
+            _StreamingResult(self, result))
+
+
+def load_results(path):
+    """
+    Description:
+        Reads a results file, ignoring a last line cut short by a kill.
+    Args:
+        path (str): Results file.
+    Returns:
+        list. Records as dicts.
+    """
+    records = []
+    with open(path) as results:
+        for line in results:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+
+    return records
+
+
+def write_junit(records, path):
+    """
+    Description:
+        Writes records as a JUnit XML report.
+    Args:
+        records (list): Records from load_results.
+        path (str): Report to write.
+    """
+    counts = dict((status, len([record for record in records
+                                if record["status"] == status]))
+                  for status in ("failed", "error", "skipped"))
+    elements = {"failed": "failure", "error": "error", "skipped": "skipped"}
+    with open(path, "w") as report:
+        report.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        report.write('<testsuite name="nosetests" tests="{0}" '
+                     'failures="{1}" errors="{2}" skip="{3}">\n'.format(
+                         len(records), counts["failed"], counts["error"],
+                         counts["skipped"]))
+        for record in records:
+            report.write('<testcase classname={0} name={1} time="{2}"'
+                         .format(quoteattr(record["classname"]),
+                                 quoteattr(record["name"]), record["time"]))
+            if record["status"] not in elements:
+                report.write('/>\n')
+                continue
+            report.write('><{0} type={1} message={2}>{3}</{0}></testcase>\n'
+                         .format(elements[record["status"]],
+                                 quoteattr(record["type"] or ""),
+                                 quoteattr(record["message"] or ""),
+                                 escape(record["text"] or "")))
+        report.write('</testsuite>\n')
+
+
+def main():
+    """
+    Description:
+        Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("results", nargs="?", default=DEFAULT_RESULTS_FILE)
+    parser.add_argument("--junit", required=True,
+                        help="JUnit XML report to write")
+    args = parser.parse_args()
+
+    write_junit(load_results(args.results), args.junit)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
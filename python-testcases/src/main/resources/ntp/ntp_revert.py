@@ -0,0 +1,183 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Snapshot of the NTP model items and /etc/ntp.conf of every
+            node, restored after 'revert' tests in at most one plan
+"""
+import time
+from litp_cli_utils import CLIUtils
+from ntp_conf_snapshot import NtpConfSnapshot, MD5SUM_PATH
+from ntp_deployment import get_deployment
+from ntp_model_builder import ModelBuilder
+from ntp_model_index import MODEL_INDEX
+from ntp_parallel import format_node_failures
+from ntp_plan_watcher import run_and_watch_plan
+from ntp_timing import timed
+
+EXPORT_FILE = "/tmp/ntp_revert_{0}.xml"
+CURRENT_FILE = "/tmp/ntp_revert_{0}_current.xml"
+
+
+class NtpStateSnapshot(object):
+    """
+    Exports every ntp-service item of the model and takes the checksum
+    of /etc/ntp.conf on every node. restore() compares the model with
+    the exports and only undoes what the test left different: items
+    the test created are removed, items it removed are loaded back and
+    items it changed are replaced. When nothing differs no plan is run
+    at all; otherwise all of it is applied in a single plan.
+    """
+
+    def __init__(self, test, ms_node, nodes, plan_timeout_mins=10,
+                 su_root=True):
+        """
+        Args:
+            test (GenericTest): Test instance used to run the commands.
+            ms_node (str): Management server filename.
+            nodes (list): Node filenames whose ntp.conf is restored.
+            plan_timeout_mins (int): Timeout of the revert plan.
+            su_root (bool): Read ntp.conf as root.
+        """
+        self.test = test
+        self.ms_node = ms_node
+        self.nodes = nodes
+        self.plan_timeout_mins = plan_timeout_mins
+        self.cli = CLIUtils()
+        self.ntp_conf = NtpConfSnapshot(test, su_root=su_root)
+        self._urls = []
+        self._digests = {}
+        self._checksums = {}
+
+    def _ntp_services(self):
+        """
+        Returns the ntp-service items of the whole model, source items
+        under /software first. The lookup always goes to the MS so
+        changes made behind the model index are not missed.
+        """
+        MODEL_INDEX.invalidate("/")
+        urls = self.test.find(self.ms_node, "/", "ntp-service",
+                              assert_not_empty=False)
+
+        return sorted(urls, key=lambda url: not url.startswith("/software"))
+
+    def _export(self, urls, file_template):
+        """
+        Exports urls to numbered files in one remote shell and returns
+        the checksum of each export.
+        """
+        if not urls:
+            return {}
+        cmds = []
+        for url in urls:
+            filepath = file_template.format(self._urls.index(url))
+            cmds.append("{0} && {1} {2}".format(
+                self.cli.get_xml_export_cmd(url, filepath), MD5SUM_PATH,
+                filepath))
+        std_out, std_err, exit_code = self.test.run_command(
+            self.ms_node, " && ".join(cmds), default_asserts=False)
+        self.test.assertEqual(0, exit_code,
+                              "Export of the NTP items failed:\n{0}"
+                              .format("\n".join(std_err)))
+
+        return dict((url, line.split()[0])
+                    for url, line in zip(urls, std_out))
+
+    def capture(self):
+        """
+        Description:
+            Takes the snapshot.
+        """
+        with timed("snapshot", self.ms_node, "capture"):
+            self._urls = self._ntp_services()
+            self._digests = self._export(self._urls, EXPORT_FILE)
+            self._checksums = self.ntp_conf.checksums(self.nodes)
+
+    def restore(self):
+        """
+        Description:
+            Brings the model and ntp.conf of every node back to the
+            snapshot and fails the test if a node's ntp.conf still
+            differs afterwards.
+        """
+        with timed("revert", self.ms_node, "restore"):
+            current = self._ntp_services()
+            kept = [url for url in self._urls if url in current]
+            digests = self._export(kept, CURRENT_FILE)
+
+            model = ModelBuilder(self.test, self.ms_node)
+            for url in reversed(current):
+                if url not in self._urls:
+                    model.remove(url)
+            for url in self._urls:
+                parent = url.rsplit("/", 1)[0]
+                filepath = EXPORT_FILE.format(self._urls.index(url))
+                if url not in current:
+                    model.load(parent, filepath, "--merge")
+                elif digests[url] != self._digests[url]:
+                    model.load(parent, filepath, "--replace")
+
+            if model.pending():
+                model.apply()
+                run_and_watch_plan(self.test, self.ms_node,
+                                   self.plan_timeout_mins)
+            else:
+                self.test.log("info", "NTP model unchanged, no revert "
+                                      "plan needed")
+            self._check_nodes()
+
+    def _check_nodes(self):
+        """
+        Waits up to one puppet cycle for ntp.conf to match the snapshot
+        on every node.
+        """
+        deadline = time.time() + self.test.get_puppet_interval(
+            self.ms_node)
+        while True:
+            checksums = self.ntp_conf.checksums(self.nodes)
+            failures = [(node, "ntp.conf differs from the snapshot")
+                        for node in self.nodes
+                        if checksums[node] != self._checksums[node]]
+            if not failures or time.time() >= deadline:
+                break
+            time.sleep(5)
+
+        self.test.assertEqual([], failures, format_node_failures(failures))
+
+
+class RevertSnapshotMixin(object):
+    """
+    Mixin for GenericTest subclasses that snapshots the NTP state
+    before every test tagged 'revert' and restores it at tearDown, so
+    such tests can register their items with add_to_cleanup=False.
+    ntp_base.NtpGenericTest sets its place among the other mixins.
+    """
+
+    def setUp(self):
+        """
+        Description:
+            Captures the snapshot for 'revert' tests.
+        """
+        super(RevertSnapshotMixin, self).setUp()
+        self._ntp_snapshot = None
+        if getattr(getattr(self, self._testMethodName), 'revert', False):
+            deployment = get_deployment(self)
+            self._ntp_snapshot = NtpStateSnapshot(self, deployment.ms_node,
+                                                  deployment.all_nodes)
+            self._ntp_snapshot.capture()
+
+    def tearDown(self):
+        """
+        Description:
+            Restores the snapshot before GenericTest cleans up.
+        """
+        try:
+            if self._ntp_snapshot is not None:
+                self._ntp_snapshot.restore()
+        finally:
+            super(RevertSnapshotMixin, self).tearDown()
@@ -0,0 +1,359 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Runs the cases of ordered_tcs.txt as independent dependency
+            chains spread over several deployments
+
+Usage:
+    python ntp_scheduler.py \\
+        --deployment A:LITP_CONN_DATA_FILE=/path/to/a_connection_data.py \\
+        --deployment B:LITP_CONN_DATA_FILE=/path/to/b_connection_data.py
+
+Dependencies between cases are read from tc_dependencies.txt. Cases
+that are connected through dependencies form a chain and always run in
+order on the same deployment. A single MS runs one plan at a time, so
+chains only run concurrently on separate deployments; on each
+deployment chains keep the relative order they have in ordered_tcs.txt.
+"""
+import argparse
+import ast
+import os
+import shlex
+import subprocess
+import threading
+import time
+from ntp_results import RESULTS_FILE_ENV, DEFAULT_RESULTS_FILE
+from ntp_timing import TIMING_FILE_ENV, DEFAULT_TIMING_FILE, case_name, \
+    load_records
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RUNNER = "nosetests -v --with-xunit --xunit-file={xunit_file}"
+
+
+def read_lines(path):
+    """
+    Description:
+        Reads a text file, dropping blank lines and '#' comments.
+    Args:
+        path (str): File to read.
+    Returns:
+        list. Stripped lines.
+    """
+    with open(path) as text_file:
+        lines = [line.split('#', 1)[0].strip() for line in text_file]
+
+    return [line for line in lines if line]
+
+
+def load_dependencies(path, cases):
+    """
+    Description:
+        Reads '<case> <dependency>' lines.
+    Args:
+        path (str): Dependency file.
+        cases (list): Known cases, used to reject typos.
+    Returns:
+        dict. Set of dependencies per case.
+    """
+    deps = dict((case, set()) for case in cases)
+    for line in read_lines(path):
+        case, dependency = line.split()
+        for name in (case, dependency):
+            if name not in deps:
+                raise ValueError("{0} is not in the ordered case list"
+                                 .format(name))
+        deps[case].add(dependency)
+
+    return deps
+
+
+def build_chains(cases, deps):
+    """
+    Description:
+        Groups cases linked by dependencies into chains and orders every
+        chain so each case comes after its dependencies, keeping the
+        ordered_tcs.txt order where the dependencies allow it.
+    Args:
+        cases (list): Cases in ordered_tcs.txt order.
+        deps (dict): Set of dependencies per case.
+    Returns:
+        list. Chains, each a list of cases, ordered by the position of
+        their first case in ordered_tcs.txt.
+    """
+    group = dict((case, case) for case in cases)
+
+    def root(case):
+        """
+        Returns the representative of the group of a case.
+        """
+        while group[case] != case:
+            group[case] = group[group[case]]
+            case = group[case]
+        return case
+
+    for case in cases:
+        for dependency in deps[case]:
+            group[root(case)] = root(dependency)
+
+    members = {}
+    for case in cases:
+        members.setdefault(root(case), []).append(case)
+
+    chains = []
+    for chain_cases in members.values():
+        ordered, done = [], set()
+        while len(ordered) < len(chain_cases):
+            ready = [case for case in chain_cases if case not in done and
+                     deps[case] <= done]
+            if not ready:
+                raise ValueError("Dependency cycle among {0}".format(
+                    sorted(set(chain_cases) - done)))
+            ordered.append(ready[0])
+            done.add(ready[0])
+        chains.append(ordered)
+
+    return sorted(chains, key=lambda chain: min(cases.index(case)
+                                                for case in chain))
+
+
+def assign_chains(chains, lanes, durations, cases):
+    """
+    Description:
+        Spreads chains over deployments, longest chain first, always
+        onto the deployment with the least work so far.
+    Args:
+        chains (list): Chains from build_chains.
+        lanes (list): Deployment names.
+        durations (dict): Expected seconds per case.
+        cases (list): Cases in ordered_tcs.txt order.
+    Returns:
+        dict. List of chains per deployment, in ordered_tcs.txt order.
+    """
+    load = dict((lane, 0.0) for lane in lanes)
+    plan = dict((lane, []) for lane in lanes)
+
+    def cost(chain):
+        """
+        Expected seconds to run a chain.
+        """
+        return sum(durations.get(case, 1.0) for case in chain)
+
+    for chain in sorted(chains, key=cost, reverse=True):
+        lane = min(lanes, key=lambda name: (load[name], lanes.index(name)))
+        plan[lane].append(chain)
+        load[lane] += cost(chain)
+
+    for lane in lanes:
+        plan[lane].sort(key=lambda chain: cases.index(chain[0]))
+
+    return plan
+
+
+def critical_path(cases, deps, durations):
+    """
+    Description:
+        Finds the longest dependency path, the lower bound on the wall
+        time of the run whatever the number of deployments.
+    Args:
+        cases (list): Cases in ordered_tcs.txt order.
+        deps (dict): Set of dependencies per case.
+        durations (dict): Seconds per case.
+    Returns:
+        tuple. (seconds, list of cases on the path)
+    """
+    finish = {}
+    previous = {}
+    remaining = list(cases)
+    while remaining:
+        for case in list(remaining):
+            if deps[case] <= set(finish):
+                before = max(deps[case], key=lambda dep: finish[dep]) \
+                    if deps[case] else None
+                previous[case] = before
+                finish[case] = durations.get(case, 1.0) + \
+                    (finish[before] if before else 0.0)
+                remaining.remove(case)
+
+    case = max(finish, key=lambda name: finish[name])
+    total = finish[case]
+    path = []
+    while case:
+        path.insert(0, case)
+        case = previous[case]
+
+    return total, path
+
+
+def load_durations(path):
+    """
+    Description:
+        Reads case durations from the 'test' records written by
+        ntp_timing.
+    Args:
+        path (str): JSON lines timing file.
+    Returns:
+        dict. Latest seconds per case.
+    """
+    durations = {}
+    for record in load_records(path):
+        if record.get("operation") == "test" and record.get("test"):
+            durations[case_name(record["test"])] = record["duration"]
+
+    return durations
+
+
+def nose_name(case):
+    """
+    Description:
+        Converts 'file.py:test_name' to the 'file.py:Class.test_name'
+        form nose expects.
+    Args:
+        case (str): Case as written in ordered_tcs.txt.
+    Returns:
+        str. Nose test name.
+    """
+    filename, test_name = case.split(":")
+    with open(os.path.join(HERE, filename)) as source:
+        tree = ast.parse(source.read())
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and any(
+                getattr(item, "name", None) == test_name
+                for item in node.body):
+            return "{0}:{1}.{2}".format(filename, node.name, test_name)
+
+    raise ValueError("{0} not found in {1}".format(test_name, filename))
+
+
+def run_lane(lane, env, chains, runner, results):
+    """
+    Description:
+        Runs the chains given to one deployment. A failing case skips
+        the rest of its chain; other chains still run.
+    Args:
+        lane (str): Deployment name.
+        env (dict): Extra environment for the deployment.
+        chains (list): Chains to run, in order.
+        runner (str): Runner command template.
+        results (dict): Filled with (status, seconds) per case.
+    """
+    lane_env = dict(os.environ)
+    lane_env.update(env)
+    count = 0
+    for chain in chains:
+        failed = False
+        for case in chain:
+            if failed:
+                results[case] = ("skipped", 0.0)
+                continue
+            count += 1
+            cmd = shlex.split(runner.format(
+                xunit_file="nosetests_{0}_{1}.xml".format(lane, count)))
+            start = time.time()
+            exit_code = subprocess.call(cmd + [nose_name(case)], cwd=HERE,
+                                        env=lane_env)
+            results[case] = ("passed" if exit_code == 0 else "failed",
+                             time.time() - start)
+            failed = exit_code != 0
+
+
+def parse_deployment(value):
+    """
+    Description:
+        Parses a NAME:VAR=VALUE[,VAR=VALUE] deployment argument.
+    Args:
+        value (str): Command line value.
+    Returns:
+        tuple. (name, dict of environment variables)
+    """
+    name, _, assignments = value.partition(":")
+    env = {}
+    for assignment in assignments.split(","):
+        if assignment:
+            key, _, val = assignment.partition("=")
+            env[key] = val
+
+    return name, env
+
+
+def main():
+    """
+    Description:
+        Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--tcs", default=os.path.join(HERE,
+                                                      "ordered_tcs.txt"))
+    parser.add_argument("--deps", default=os.path.join(HERE,
+                                                       "tc_dependencies.txt"))
+    parser.add_argument("--deployment", action="append", default=[],
+                        help="NAME:VAR=VALUE[,VAR=VALUE], repeatable")
+    parser.add_argument("--durations", default=DEFAULT_TIMING_FILE,
+                        help="timing file used to balance deployments, "
+                             "replaced by the timings of this run")
+    parser.add_argument("--runner", default=DEFAULT_RUNNER)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    cases = read_lines(args.tcs)
+    deps = load_dependencies(args.deps, cases)
+    chains = build_chains(cases, deps)
+    deployments = [parse_deployment(value) for value in args.deployment] \
+        or [("default", {})]
+    lanes = [name for name, _ in deployments]
+    durations = load_durations(args.durations)
+    plan = assign_chains(chains, lanes, durations, cases)
+
+    for lane in lanes:
+        print("{0}:".format(lane))
+        for chain in plan[lane]:
+            print("    " + " -> ".join(chain))
+    expected, path = critical_path(cases, deps, durations)
+    print("Expected critical path {0:.0f}s: {1}".format(expected,
+                                                        " -> ".join(path)))
+    if args.dry_run:
+        return 0
+
+    # Every case runs in its own process, so the results of the whole
+    # run are collected in one file named for all of them
+    session_env = {}
+    if RESULTS_FILE_ENV not in os.environ:
+        open(DEFAULT_RESULTS_FILE, "w").close()
+        session_env[RESULTS_FILE_ENV] = DEFAULT_RESULTS_FILE
+    # Likewise for the timings, which balance the next run
+    if TIMING_FILE_ENV not in os.environ:
+        open(args.durations, "w").close()
+        session_env[TIMING_FILE_ENV] = os.path.abspath(args.durations)
+
+    results = {}
+    threads = [threading.Thread(target=run_lane,
+                                args=(lane, dict(session_env, **env),
+                                      plan[lane], args.runner, results))
+               for lane, env in deployments]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.time() - start
+
+    measured = dict((case, seconds) for case, (_, seconds)
+                    in results.items())
+    actual, path = critical_path(cases, deps, measured)
+    for case in cases:
+        status, seconds = results.get(case, ("not run", 0.0))
+        print("{0:8} {1:8.1f}s {2}".format(status, seconds, case))
+    print("Wall time {0:.0f}s, critical path {1:.0f}s: {2}".format(
+        wall_time, actual, " -> ".join(path)))
+
+    return 0 if all(status == "passed"
+                    for status, _ in results.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
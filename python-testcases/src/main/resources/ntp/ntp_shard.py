@@ -0,0 +1,129 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Splits ordered_tcs.txt into balanced shards, one per
+            deployment, keeping dependency chains together
+
+Usage:
+    python ntp_shard.py --shards 3
+    python ntp_shard.py --shards 3 --index 1 --output ordered_tcs.txt
+
+Without --index the shards are printed with their expected duration.
+With it, the cases of that shard are written in ordered_tcs.txt order.
+When the output is the case list itself the full list is first kept in
+ordered_tcs.txt.all, and later runs shard that copy.
+"""
+import argparse
+import os
+import shutil
+from ntp_durations import DurationStore
+from ntp_scheduler import HERE, assign_chains, build_chains, \
+    load_dependencies, read_lines
+from ntp_stats import percentile
+
+# Expected seconds of a case when the store has no case at all
+UNKNOWN_CASE_SECS = 300.0
+
+
+def fill_durations(cases, durations):
+    """
+    Description:
+        Gives cases without history the median duration of the cases
+        that have one.
+    Args:
+        cases (list): All cases.
+        durations (dict): Stored seconds per case.
+    Returns:
+        dict. Seconds for every case.
+    """
+    default = percentile(list(durations.values()), 50) or UNKNOWN_CASE_SECS
+
+    return dict((case, durations.get(case, default)) for case in cases)
+
+
+def make_shards(cases, deps, durations, count):
+    """
+    Description:
+        Splits cases into shards of about equal expected duration.
+        Cases linked by dependencies stay in one shard.
+    Args:
+        cases (list): Cases in ordered_tcs.txt order.
+        deps (dict): Set of dependencies per case.
+        durations (dict): Seconds for every case.
+        count (int): Number of shards.
+    Returns:
+        list. Cases of each shard, in ordered_tcs.txt order.
+    """
+    shards = list(range(count))
+    plan = assign_chains(build_chains(cases, deps), shards, durations, cases)
+
+    return [sorted([case for chain in plan[shard] for case in chain],
+                   key=cases.index)
+            for shard in shards]
+
+
+def main():
+    """
+    Description:
+        Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--tcs", default=os.path.join(HERE,
+                                                      "ordered_tcs.txt"))
+    parser.add_argument("--deps", default=os.path.join(HERE,
+                                                       "tc_dependencies.txt"))
+    parser.add_argument("--db", help="duration store, see ntp_durations")
+    parser.add_argument("--shards", type=int, required=True)
+    parser.add_argument("--index", type=int,
+                        help="shard to write, from 0")
+    parser.add_argument("--output", help="file the shard is written to, "
+                                         "stdout by default")
+    args = parser.parse_args()
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.index is not None and not 0 <= args.index < args.shards:
+        parser.error("--index must be from 0 to {0}".format(args.shards - 1))
+
+    full_list = args.tcs + ".all"
+    cases = read_lines(full_list if os.path.exists(full_list) else args.tcs)
+    deps = load_dependencies(args.deps, cases)
+    store = DurationStore(args.db)
+    try:
+        durations = fill_durations(cases, store.expected(cases))
+    finally:
+        store.close()
+    shards = make_shards(cases, deps, durations, args.shards)
+
+    if args.index is None:
+        total = sum(durations.values())
+        for index, shard in enumerate(shards):
+            print("Shard {0}: {1} case(s), {2:.0f}s".format(
+                index, len(shard),
+                sum(durations[case] for case in shard)))
+            for case in shard:
+                print("    " + case)
+        print("Total {0:.0f}s, {1:.0f}s per shard if perfectly balanced"
+              .format(total, total / args.shards))
+        return 0
+
+    if args.output:
+        if os.path.abspath(args.output) == os.path.abspath(args.tcs) and \
+                not os.path.exists(full_list):
+            shutil.copyfile(args.tcs, full_list)
+        with open(args.output, "w") as output:
+            output.write("".join(case + "\n"
+                                 for case in shards[args.index]))
+    else:
+        print("\n".join(shards[args.index]))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
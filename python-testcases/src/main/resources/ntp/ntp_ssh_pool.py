@@ -0,0 +1,250 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Keeps one SSH session per node open for the whole test
+            session and runs every command on a new channel of it
+
+Set NTP_SSH_POOL=1 to use it. By default commands go through the
+GenericTest connection handling.
+"""
+import atexit
+import os
+import socket
+import threading
+
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+POOL_ENV = "NTP_SSH_POOL"
+CONNECT_TIMEOUT_SECS = 10
+KEEPALIVE_SECS = 30
+POOLED_KWARGS = ("default_asserts", "logging", "su_root")
+
+
+def pool_enabled():
+    """
+    Returns:
+        bool. True when paramiko is available and NTP_SSH_POOL is set
+        to something other than 0.
+    """
+    return paramiko is not None and \
+        os.environ.get(POOL_ENV, "") not in ("", "0")
+
+
+def read_output(std_out, std_err):
+    """
+    Description:
+        Reads stdout and stderr of a command at the same time, so a
+        command filling the stderr window while stdout is read does not
+        block forever.
+    Args:
+        std_out (paramiko.ChannelFile): stdout of the command.
+        std_err (paramiko.ChannelFile): stderr of the command.
+    Returns:
+        tuple. (stdout text, stderr text)
+    """
+    errors = []
+    reader = threading.Thread(target=lambda: errors.append(std_err.read()))
+    reader.daemon = True
+    reader.start()
+    out = std_out.read()
+    reader.join()
+
+    return (out.decode("utf-8", "replace"),
+            b"".join(errors).decode("utf-8", "replace"))
+
+
+class SshConnectionPool(object):
+    """
+    One authenticated paramiko client per node. Commands run on their
+    own channel of the node's transport, so concurrent commands to the
+    same node share the session. A client is checked before reuse and
+    replaced when its transport is gone.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._node_locks = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.reconnects = 0
+
+    def _node_lock(self, node):
+        """
+        Returns the lock serialising connects to a node.
+        """
+        with self._lock:
+            return self._node_locks.setdefault(node, threading.Lock())
+
+    @staticmethod
+    def _healthy(client):
+        """
+        Returns True if the transport of client is still usable.
+        """
+        transport = client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except (socket.error, EOFError, paramiko.SSHException):
+            return False
+        return True
+
+    def client(self, node, host, username, password):
+        """
+        Description:
+            Returns the open client of a node, connecting first if there
+            is none or the existing one no longer answers.
+        Args:
+            node (str): Node filename, the pool key.
+            host (str): Address to connect to.
+            username (str): Login user.
+            password (str): Login password.
+        Returns:
+            paramiko.SSHClient. Connected client.
+        """
+        with self._node_lock(node):
+            client = self._clients.get(node)
+            if client is not None and self._healthy(client):
+                with self._lock:
+                    self.reused += 1
+                return client
+            if client is not None:
+                client.close()
+                with self._lock:
+                    self.reconnects += 1
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(host, username=username, password=password,
+                           timeout=CONNECT_TIMEOUT_SECS, allow_agent=False,
+                           look_for_keys=False)
+            client.get_transport().set_keepalive(KEEPALIVE_SECS)
+            self._clients[node] = client
+            with self._lock:
+                self.created += 1
+            return client
+
+    def discard(self, node):
+        """
+        Description:
+            Closes and forgets the client of a node.
+        Args:
+            node (str): Node filename.
+        """
+        with self._node_lock(node):
+            client = self._clients.pop(node, None)
+        if client is not None:
+            client.close()
+
+    def run(self, node, host, username, password, cmd):
+        """
+        Description:
+            Runs cmd on the pooled session of a node. When the channel
+            for it cannot be opened on a dropped connection, it is
+            opened once more on a new connection. Once cmd has been
+            sent it is never retried, since it may already have run.
+        Args:
+            node (str): Node filename.
+            host (str): Address to connect to.
+            username (str): Login user.
+            password (str): Login password.
+            cmd (str): Command to run.
+        Returns:
+            tuple. (stdout lines, stderr lines, exit code)
+        """
+        for attempt in (1, 2):
+            client = self.client(node, host, username, password)
+            try:
+                channel = client.get_transport().open_session()
+            except (socket.error, EOFError, paramiko.SSHException):
+                self.discard(node)
+                if attempt == 2:
+                    raise
+                continue
+            try:
+                channel.exec_command(cmd)
+                out, err = read_output(channel.makefile("rb"),
+                                       channel.makefile_stderr("rb"))
+                exit_code = channel.recv_exit_status()
+            except (socket.error, EOFError, paramiko.SSHException):
+                self.discard(node)
+                raise
+            finally:
+                channel.close()
+            return out.splitlines(), err.splitlines(), exit_code
+
+    def close_all(self):
+        """
+        Description:
+            Closes every pooled client.
+        """
+        for node in list(self._clients):
+            self.discard(node)
+
+    def report(self):
+        """
+        Returns:
+            str. Connections created and calls that reused one.
+        """
+        return "SSH pool: {0} connection(s) created, {1} call(s) " \
+               "reused a connection, {2} reconnect(s)".format(
+                   self.created, self.reused, self.reconnects)
+
+
+POOL = SshConnectionPool()
+atexit.register(POOL.close_all)
+
+
+class SshPoolMixin(object):
+    """
+    Mixin for GenericTest subclasses that sends run_command through the
+    session wide POOL when NTP_SSH_POOL is set. GenericTest runs
+    execute_cli_*_cmd and wait_for_cmd through run_command, so they use
+    the pool as well.
+    Commands that need options the pool does not handle, like su_root,
+    still go through GenericTest. ntp_base.NtpGenericTest sets its
+    place among the other mixins.
+    """
+
+    def tearDown(self):
+        """
+        Description:
+            Logs the pool usage so far.
+        """
+        super(SshPoolMixin, self).tearDown()
+        if pool_enabled():
+            self.log("info", POOL.report())
+
+    def run_command(self, node, cmd, *args, **kwargs):
+        """
+        Description:
+            GenericTest.run_command over a pooled connection. With
+            default_asserts the exit code must be 0 and stderr empty,
+            as in GenericTest.
+        Returns:
+            tuple. (stdout lines, stderr lines, exit code)
+        """
+        if args or not pool_enabled() or kwargs.get("su_root") or \
+                any(key not in POOLED_KWARGS for key in kwargs):
+            return super(SshPoolMixin, self).run_command(node, cmd, *args,
+                                                         **kwargs)
+        if kwargs.get("logging", True):
+            self.log("info", "[{0}] {1}".format(node, cmd))
+        std_out, std_err, exit_code = POOL.run(
+            node, self.get_node_att(node, "ipv4"),
+            self.get_node_att(node, "username"),
+            self.get_node_att(node, "password"), cmd)
+        if kwargs.get("default_asserts", False):
+            self.assertEqual(0, exit_code)
+            self.assertEqual([], std_err)
+
+        return std_out, std_err, exit_code
@@ -0,0 +1,793 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   In-process stand-in for the MS and peer nodes so the NTP
+            testsets can run without a deployment
+
+Set NTP_STANDIN=1 to enable it. NTP_STANDIN_PEERS sets the number of
+peer nodes (default 2) and NTP_STANDIN_SYNC_SECS how long ntpstat keeps
+failing after a node's ntp.conf changes (default 0).
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import shlex
+import time
+import unittest
+import test_constants
+
+STANDIN_ENV = "NTP_STANDIN"
+PEERS_ENV = "NTP_STANDIN_PEERS"
+SYNC_SECS_ENV = "NTP_STANDIN_SYNC_SECS"
+
+MS_NODE = "ms1"
+MS_IP = "192.168.0.42"
+MS_URL = "/ms"
+NODES_URL = "/deployments/d1/clusters/c1/nodes"
+NTP_CONF = "/etc/ntp.conf"
+LOCAL_CLOCK = "127.127.1.0"
+
+CHILD_COLLECTIONS = {
+    "ms": {"items": "software-item", "configs": "node-config"},
+    "node": {"items": "software-item", "configs": "node-config"},
+    "ntp-service": {"servers": "ntp-server"},
+    "alias-node-config": {"aliases": "alias"},
+}
+
+APPLIED = "Applied"
+INITIAL = "Initial"
+UPDATED = "Updated"
+FOR_REMOVAL = "ForRemoval"
+
+
+def standin_enabled():
+    """
+    Returns:
+        bool. True when the testsets should run against the stand-in.
+    """
+    return os.environ.get(STANDIN_ENV, "") not in ("", "0")
+
+
+class StandinError(Exception):
+    """
+    Raised for litp commands the real MS would reject.
+    """
+
+
+class StandinDeployment(object):
+    """
+    In-memory LITP model, plan executor and node file system. The
+    model is a dict of path to item; inherited items keep a link to
+    their source and read their children through it. Running a plan
+    applies the model and renders /etc/ntp.conf on every node with the
+    rules of the NTP plugin:
+        - the MS uses the servers of its ntp-services and always keeps
+          the local clock with fudge stratum 10;
+        - a peer node uses the servers of its ntp-services and falls
+          back to the MS address when it has none;
+        - the prefix of an IPv6 server address is dropped.
+    """
+
+    def __init__(self, peers=2, sync_secs=0):
+        """
+        Args:
+            peers (int): Number of peer nodes.
+            sync_secs (int): Seconds ntpstat fails after a change.
+        """
+        self.peers = ["node{0}".format(i) for i in range(1, peers + 1)]
+        self.sync_secs = sync_secs
+        self.items = {}
+        self.files = {}
+        self.changed_at = {}
+        self.exports = {}
+        self.plan = None
+        self.plan_state = None
+
+        for path in ("/", "/software", "/deployments", "/deployments/d1",
+                     "/deployments/d1/clusters",
+                     "/deployments/d1/clusters/c1"):
+            self._add(path, "container", {}, APPLIED)
+        self._add("/software/items", "collection-of-software-item", {},
+                  APPLIED)
+        self._add(NODES_URL, "collection-of-node", {}, APPLIED)
+        self._add(MS_URL, "ms", {"hostname": MS_NODE}, APPLIED)
+        for node in self.peers:
+            self._add(self.node_url(node), "node", {"hostname": node},
+                      APPLIED)
+        self._add("/software/items/ntp1", "ntp-service", {}, APPLIED)
+        self._add(MS_URL + "/items/ntp1", "ntp-service", {}, APPLIED,
+                  source="/software/items/ntp1")
+        self._render()
+
+    @staticmethod
+    def node_url(node):
+        """
+        Returns the model path of a peer node.
+        """
+        return "{0}/{1}".format(NODES_URL, node)
+
+    def node_ip(self, node):
+        """
+        Returns the IPv4 address of a node.
+        """
+        if node == MS_NODE:
+            return MS_IP
+        return "192.168.0.{0}".format(43 + self.peers.index(node))
+
+    def _add(self, path, item_type, props, state, source=None):
+        """
+        Adds an item and the child collections its type carries.
+        """
+        self.items[path] = {"type": item_type, "props": dict(props),
+                            "state": state, "source": source}
+        for name, child_type in CHILD_COLLECTIONS.get(item_type,
+                                                      {}).items():
+            if source is None:
+                self._add("{0}/{1}".format(path, name),
+                          "collection-of-" + child_type, {}, state)
+
+    def _children(self, path):
+        """
+        Returns the direct children of an item, following inherit
+        links.
+        """
+        item = self.items[path]
+        base = item["source"] or path
+        prefix = base.rstrip("/") + "/"
+        return sorted(child for child in self.items
+                      if child.startswith(prefix) and
+                      "/" not in child[len(prefix):])
+
+    def _subtree(self, path):
+        """
+        Returns an item and every item below it.
+        """
+        return [item for item in self.items
+                if item == path or item.startswith(path.rstrip("/") + "/")]
+
+    # Model operations
+
+    def create(self, path, item_type, props):
+        """
+        Handles litp create.
+        """
+        parent = path.rsplit("/", 1)[0] or "/"
+        if path in self.items:
+            raise StandinError("ItemExistsError {0}".format(path))
+        if parent not in self.items:
+            raise StandinError("InvalidLocationError {0}".format(path))
+        self._add(path, item_type, props, INITIAL)
+
+    def inherit(self, path, source, props):
+        """
+        Handles litp inherit.
+        """
+        if source not in self.items:
+            raise StandinError("InvalidLocationError {0}".format(source))
+        if path in self.items:
+            raise StandinError("ItemExistsError {0}".format(path))
+        self._add(path, self.items[source]["type"], props, INITIAL,
+                  source=source)
+
+    def update(self, path, props):
+        """
+        Handles litp update.
+        """
+        if path not in self.items:
+            raise StandinError("InvalidLocationError {0}".format(path))
+        item = self.items[path]
+        item["props"].update(props)
+        if item["state"] != INITIAL:
+            item["state"] = UPDATED
+
+    def remove(self, path):
+        """
+        Handles litp remove. Items never applied are deleted, applied
+        items and the items inherited from them are marked ForRemoval.
+        """
+        if path not in self.items:
+            raise StandinError("InvalidLocationError {0}".format(path))
+        affected = self._subtree(path)
+        affected += [item for item, data in self.items.items()
+                     if data["source"] in affected]
+        for item in affected:
+            if item not in self.items:
+                continue
+            if self.items[item]["state"] == INITIAL:
+                del self.items[item]
+            else:
+                self.items[item]["state"] = FOR_REMOVAL
+
+    def find(self, path, resource, rtype_option=True):
+        """
+        Handles find() queries: items of type resource, or with
+        rtype_option False the collections of that type.
+        """
+        wanted = resource if rtype_option else "collection-of-" + resource
+        return sorted(item for item in self._subtree(path)
+                      if self.items[item]["type"] == wanted)
+
+    def export(self, path, filepath):
+        """
+        Handles litp export. The export is kept in memory, one JSON
+        line per item with its path relative to the parent of path.
+        """
+        if path not in self.items:
+            raise StandinError("InvalidLocationError {0}".format(path))
+        parent = path.rsplit("/", 1)[0]
+        self.exports[filepath] = [
+            json.dumps([item[len(parent):], self.items[item]["type"],
+                        self.items[item]["props"],
+                        self.items[item]["source"]], sort_keys=True)
+            for item in sorted(self._subtree(path))
+            if self.items[item]["state"] != FOR_REMOVAL]
+
+    def load(self, path, filepath, merge=False, replace=False):
+        """
+        Handles litp load of an export under path. Existing items are
+        an error unless merge or replace is given; replace also resets
+        their properties to the exported ones.
+        """
+        if filepath not in self.exports:
+            raise StandinError("No such file {0}".format(filepath))
+        for line in self.exports[filepath]:
+            relative, item_type, props, source = json.loads(line)
+            item = path.rstrip("/") + relative
+            if item not in self.items:
+                self.items[item] = {"type": item_type, "props": props,
+                                    "state": INITIAL, "source": source}
+                continue
+            if not (merge or replace):
+                raise StandinError("ItemExistsError {0}".format(item))
+            data = self.items[item]
+            if replace and data["props"] != props:
+                data["props"] = props
+                data["state"] = UPDATED
+            elif data["state"] == FOR_REMOVAL:
+                data["state"] = UPDATED
+
+    # Plans
+
+    def create_plan(self):
+        """
+        Handles litp create_plan.
+        """
+        if all(data["state"] == APPLIED for data in self.items.values()):
+            raise StandinError("DoNothingPlanError Create plan failed: "
+                               "no tasks were generated")
+        rendered = self._render(dry_run=True)
+        self.plan = [(1 if node == MS_NODE else 2,
+                      MS_URL if node == MS_NODE else self.node_url(node),
+                      'Configure NTP on node "{0}"'.format(node))
+                     for node in [MS_NODE] + self.peers
+                     if rendered[node] != self.files.get(node)]
+        if not self.plan:
+            self.plan = [(1, MS_URL, "Update model items")]
+        self.plan_state = "Initial"
+
+    def run_plan(self):
+        """
+        Handles litp run_plan. The plan completes immediately.
+        """
+        if self.plan_state != "Initial":
+            raise StandinError("InvalidRequestError Plan does not exist")
+        for path in list(self.items):
+            if path not in self.items:
+                continue
+            state = self.items[path]["state"]
+            if state == FOR_REMOVAL:
+                for item in self._subtree(path):
+                    self.items.pop(item, None)
+            elif state in (INITIAL, UPDATED):
+                self.items[path]["state"] = APPLIED
+        self._render()
+        self.plan_state = "Successful"
+
+    def show_plan(self):
+        """
+        Handles litp show_plan.
+        """
+        if self.plan is None:
+            raise StandinError("InvalidLocationError Plan does not exist")
+        status = "Success" if self.plan_state == "Successful" else "Initial"
+        lines = []
+        for phase in sorted(set(task[0] for task in self.plan)):
+            lines += ["Phase {0}".format(phase), "Task status",
+                      "-----------"]
+            for _, path, description in [task for task in self.plan
+                                         if task[0] == phase]:
+                lines += ["{0}\t\t{1}".format(status, path),
+                          "\t\t{0}".format(description)]
+            lines.append("")
+        lines.append("Plan Status: {0}".format(self.plan_state))
+        return lines
+
+    # Node side
+
+    def _servers(self, node_path):
+        """
+        Returns the ntp servers of the ntp-services of a node.
+        """
+        servers = []
+        for item in self._children(node_path + "/items"):
+            if self.items[item]["type"] != "ntp-service" or \
+                    self.items[item]["state"] == FOR_REMOVAL:
+                continue
+            for server in self._children(item):
+                if server.endswith("/servers"):
+                    for entry in self._children(server):
+                        if self.items[entry]["state"] == FOR_REMOVAL:
+                            continue
+                        address = self.items[entry]["props"].get("server")
+                        if address:
+                            servers.append(address.split("/")[0])
+        return servers
+
+    def _render(self, dry_run=False):
+        """
+        Renders ntp.conf for every node from the applied model.
+        """
+        header = ["# Generated by LITP", "driftfile /var/lib/ntp/drift",
+                  "restrict default kod nomodify notrap nopeer noquery",
+                  "restrict 127.0.0.1"]
+        rendered = {}
+        ms_servers = self._servers(MS_URL)
+        rendered[MS_NODE] = header + \
+            ["server {0}".format(server) for server in ms_servers] + \
+            ["server {0} # local clock".format(LOCAL_CLOCK),
+             "fudge {0} stratum 10".format(LOCAL_CLOCK)]
+        for node in self.peers:
+            servers = self._servers(self.node_url(node)) or [MS_IP]
+            rendered[node] = header + ["server {0}".format(server)
+                                       for server in servers]
+        if dry_run:
+            return rendered
+        now = time.time()
+        for node, lines in rendered.items():
+            if self.files.get(node) != lines:
+                self.files[node] = lines
+                self.changed_at[node] = now
+        return rendered
+
+    def ntpstat(self, node):
+        """
+        Returns 0 once sync_secs have passed since ntp.conf changed.
+        """
+        synced = time.time() - self.changed_at.get(node, 0) >= \
+            self.sync_secs
+        return 0 if synced else 1
+
+    def ntpq_peers(self, node):
+        """
+        Returns an 'ntpq -pn' peer table for the servers in ntp.conf.
+        Until the node is in sync no peer is selected and reach is 0.
+        """
+        synced = self.ntpstat(node) == 0
+        lines = ["     remote           refid      st t when poll reach   "
+                 "delay   offset  jitter",
+                 "=" * 78]
+        servers = [line.split()[1] for line in self.files[node]
+                   if line.startswith("server ")]
+        for index, server in enumerate(servers):
+            tally = "*" if synced and index == 0 else \
+                "+" if synced else " "
+            if server == LOCAL_CLOCK:
+                refid, stratum, offset = ".LOCL.", 10, 0.0
+            else:
+                refid, stratum = LOCAL_CLOCK, 11
+                offset = (int(hashlib.md5(
+                    (node + server).encode("utf-8")).hexdigest()[:4],
+                    16) % 2000 - 1000) / 1000.0
+            lines.append("{0}{1:15} {2:15} {3:2} u   32   64  {4:>3} "
+                         "{5:7.3f} {6:8.3f} {7:7.3f}".format(
+                             tally, server, refid, stratum,
+                             "377" if synced else "0", 0.150, offset,
+                             0.020))
+        return lines
+
+    @staticmethod
+    def resolve(name):
+        """
+        Resolves every name but those under .invalid, to a made up
+        address.
+        """
+        if name.endswith(".invalid"):
+            return [], [], 2
+        return ["10.0.0.{0}      {1}".format(len(name) % 250 + 1, name)], \
+            [], 0
+
+    def ntp_query(self, server):
+        """
+        Answers a single NTP query for every server that resolves.
+        """
+        if self.resolve(server)[2] != 0:
+            return [], ["Error resolving {0}: Name or service not "
+                        "known".format(server)], 1
+        return ["server {0}, stratum 2, offset 0.000120, delay "
+                "0.02571".format(server)], [], 0
+
+    # Command dispatch
+
+    def run(self, node, cmd):
+        """
+        Description:
+            Runs a shell command line made of litp, cat, md5sum, grep,
+            ntpstat, ntpq, ntpdate, pgrep and getent commands joined
+            with '&&' or ';'.
+        Returns:
+            tuple. (stdout lines, stderr lines, exit code)
+        """
+        std_out, std_err, exit_code = [], [], 0
+        for separator, simple in _split_commands(cmd):
+            if separator == "&&" and exit_code != 0:
+                break
+            out, err, exit_code = self._run_simple(node, shlex.split(simple))
+            std_out += out
+            std_err += err
+        return std_out, std_err, exit_code
+
+    def _run_simple(self, node, argv):
+        """
+        Runs a single command.
+        """
+        program = os.path.basename(argv[0])
+        try:
+            if program == "litp":
+                return self._litp(argv[1:])
+            if program == "ntpstat":
+                return [], [], self.ntpstat(node)
+            if program == "ntpq" and argv[1:] == ["-pn"]:
+                return self.ntpq_peers(node), [], 0
+            if program == "cat" and argv[1:] == [NTP_CONF]:
+                return list(self.files[node]), [], 0
+            if program == "md5sum":
+                lines = self.files[node] if argv[1:] == [NTP_CONF] else \
+                    self.exports.get(argv[1])
+                if lines is None:
+                    return [], ["md5sum: {0}: No such file".format(
+                        argv[1])], 1
+                digest = hashlib.md5(
+                    "\n".join(lines).encode("utf-8")).hexdigest()
+                return ["{0}  {1}".format(digest, argv[1])], [], 0
+            if program == "pgrep" and argv[-1] == "ntpd":
+                return ["1234"], [], 0
+            if program == "getent" and argv[1] == "hosts":
+                return self.resolve(argv[2])
+            if program == "ntpdate" and "-q" in argv:
+                return self.ntp_query(argv[-1])
+            if program == "grep" and argv[-1] == NTP_CONF:
+                return _grep(argv[1:-1], self.files[node])
+        except StandinError as error:
+            return [], [str(error)], 1
+        return [], ["{0}: command not found".format(program)], 127
+
+    def _litp(self, args):
+        """
+        Runs a litp CLI command.
+        """
+        action, opts = args[0], _parse_litp_options(args[1:])
+        if action == "create":
+            self.create(opts["-p"], opts["-t"], opts.get("-o", {}))
+        elif action == "inherit":
+            self.inherit(opts["-p"], opts["-s"], opts.get("-o", {}))
+        elif action == "update":
+            self.update(opts["-p"], opts.get("-o", {}))
+        elif action == "remove":
+            self.remove(opts["-p"])
+        elif action == "export":
+            self.export(opts["-p"], opts["-f"])
+        elif action == "load":
+            self.load(opts["-p"], opts["-f"], "--merge" in opts,
+                      "--replace" in opts)
+        elif action == "create_plan":
+            self.create_plan()
+        elif action == "run_plan":
+            self.run_plan()
+        elif action == "show_plan":
+            return self.show_plan(), [], 0
+        else:
+            raise StandinError("Unsupported litp action {0}".format(action))
+        return [], [], 0
+
+
+def _split_commands(cmd):
+    """
+    Splits a command line on '&&' and ';', returning (separator that
+    precedes the command, command) pairs.
+    """
+    parts = re.split(r"\s*(&&|;)\s*", cmd.strip())
+    commands = [(None, parts[0])]
+    for index in range(1, len(parts), 2):
+        if parts[index + 1]:
+            commands.append((parts[index], parts[index + 1]))
+    return commands
+
+
+def _parse_litp_options(args):
+    """
+    Parses litp CLI options. Values of -o are returned as a dict.
+    """
+    opts = {}
+    option = None
+    for arg in args:
+        if arg.startswith("--"):
+            option = None
+            opts[arg] = True
+        elif arg.startswith("-"):
+            option = arg
+            opts[option] = {} if option == "-o" else True
+        elif option == "-o":
+            key, _, value = arg.partition("=")
+            opts["-o"][key] = value.strip("'\"")
+        elif option is not None:
+            opts[option] = arg
+    return opts
+
+
+def _grep(args, lines):
+    """
+    Minimal grep supporting -E and several -e patterns.
+    """
+    patterns = []
+    index = 0
+    while index < len(args):
+        if args[index] == "-e":
+            patterns.append(args[index + 1])
+            index += 1
+        elif not args[index].startswith("-"):
+            patterns.append(args[index])
+        index += 1
+    matches = [line for line in lines
+               if any(re.search(pattern, line) for pattern in patterns)]
+    return matches, [], 0 if matches else 1
+
+
+_DEPLOYMENT = []
+
+
+def get_standin():
+    """
+    Returns:
+        StandinDeployment. The session wide stand-in, created on first
+        use so its model state carries over between tests like a real
+        deployment.
+    """
+    if not _DEPLOYMENT:
+        _DEPLOYMENT.append(StandinDeployment(
+            peers=int(os.environ.get(PEERS_ENV, "2")),
+            sync_secs=float(os.environ.get(SYNC_SECS_ENV, "0"))))
+    return _DEPLOYMENT[0]
+
+
+class StandinMixin(object):
+    """
+    Mixin that redirects the GenericTest methods used by the NTP
+    testsets to the stand-in when NTP_STANDIN is set, and to
+    GenericTest otherwise. ntp_base.NtpGenericTest sets its place
+    among the other mixins.
+    """
+
+    def setUp(self):
+        """
+        Skips the GenericTest connection setup when running offline.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).setUp()
+        unittest.TestCase.setUp(self)
+        self._standin_cleanup = []
+
+    def tearDown(self):
+        """
+        Removes the items registered for cleanup and applies them.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).tearDown()
+        standin = get_standin()
+        for url in reversed(self._standin_cleanup):
+            if url in standin.items:
+                standin.remove(url)
+        try:
+            standin.create_plan()
+            standin.run_plan()
+        except StandinError:
+            pass
+
+    def log(self, level, message):
+        """
+        Logs through the logging module when running offline.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).log(level, message)
+        logging.getLogger(self.id()).log(
+            getattr(logging, level.upper(), logging.INFO), message)
+
+    def get_management_node_filename(self):
+        """
+        Stand-in aware GenericTest.get_management_node_filename.
+        """
+        if not standin_enabled():
+            return super(StandinMixin,
+                         self).get_management_node_filename()
+        return MS_NODE
+
+    def get_managed_node_filenames(self):
+        """
+        Stand-in aware GenericTest.get_managed_node_filenames.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).get_managed_node_filenames()
+        return list(get_standin().peers)
+
+    def get_node_att(self, node, attribute):
+        """
+        Stand-in aware GenericTest.get_node_att, ipv4 only.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).get_node_att(node, attribute)
+        return get_standin().node_ip(node)
+
+    def get_node_url_from_filename(self, ms_node, node):
+        """
+        Stand-in aware GenericTest.get_node_url_from_filename.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).get_node_url_from_filename(
+                ms_node, node)
+        return get_standin().node_url(node)
+
+    def get_puppet_interval(self, node):
+        """
+        Stand-in aware GenericTest.get_puppet_interval.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).get_puppet_interval(node)
+        return 1
+
+    def find(self, node, path, resource, rtype_option=True,
+             assert_not_empty=True, **kwargs):
+        """
+        Stand-in aware GenericTest.find.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).find(
+                node, path, resource, rtype_option, assert_not_empty,
+                **kwargs)
+        result = get_standin().find(path, resource, rtype_option)
+        if assert_not_empty:
+            self.assertNotEqual([], result)
+        return result
+
+    def run_command(self, node, cmd, *args, **kwargs):
+        """
+        Stand-in aware GenericTest.run_command.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).run_command(node, cmd, *args,
+                                                         **kwargs)
+        std_out, std_err, exit_code = get_standin().run(node, cmd)
+        if kwargs.get("default_asserts"):
+            self.assertEqual([], std_err)
+            self.assertEqual(0, exit_code)
+        return std_out, std_err, exit_code
+
+    def _standin_cli(self, action, *args):
+        """
+        Runs a model operation and fails the test like the CLI would.
+        """
+        try:
+            getattr(get_standin(), action)(*args)
+        except StandinError as error:
+            self.fail("litp {0} failed: {1}".format(action, error))
+
+    def execute_cli_create_cmd(self, node, url, class_type, props='',
+                               *args, **kwargs):
+        """
+        Stand-in aware GenericTest.execute_cli_create_cmd.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).execute_cli_create_cmd(
+                node, url, class_type, props, *args, **kwargs)
+        self._standin_cli("create", url, class_type,
+                          _parse_props(props))
+        if kwargs.get("add_to_cleanup", True):
+            self._standin_cleanup.append(url)
+
+    def execute_cli_inherit_cmd(self, node, url, source_path, props='',
+                                *args, **kwargs):
+        """
+        Stand-in aware GenericTest.execute_cli_inherit_cmd.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).execute_cli_inherit_cmd(
+                node, url, source_path, props, *args, **kwargs)
+        self._standin_cli("inherit", url, source_path, _parse_props(props))
+        if kwargs.get("add_to_cleanup", True):
+            self._standin_cleanup.append(url)
+
+    def execute_cli_update_cmd(self, node, url, props, *args, **kwargs):
+        """
+        Stand-in aware GenericTest.execute_cli_update_cmd.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).execute_cli_update_cmd(
+                node, url, props, *args, **kwargs)
+        self._standin_cli("update", url, _parse_props(props))
+
+    def execute_cli_remove_cmd(self, node, url, *args, **kwargs):
+        """
+        Stand-in aware GenericTest.execute_cli_remove_cmd.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).execute_cli_remove_cmd(
+                node, url, *args, **kwargs)
+        self._standin_cli("remove", url)
+
+    def execute_cli_createplan_cmd(self, node, *args, **kwargs):
+        """
+        Stand-in aware GenericTest.execute_cli_createplan_cmd.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).execute_cli_createplan_cmd(
+                node, *args, **kwargs)
+        self._standin_cli("create_plan")
+
+    def execute_cli_runplan_cmd(self, node, *args, **kwargs):
+        """
+        Stand-in aware GenericTest.execute_cli_runplan_cmd.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).execute_cli_runplan_cmd(
+                node, *args, **kwargs)
+        self._standin_cli("run_plan")
+
+    def wait_for_plan_state(self, node, state, *args, **kwargs):
+        """
+        Stand-in aware GenericTest.wait_for_plan_state. Plans complete
+        as soon as they are run.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).wait_for_plan_state(
+                node, state, *args, **kwargs)
+        return state == test_constants.PLAN_COMPLETE and \
+            get_standin().plan_state == "Successful"
+
+    def run_and_check_plan(self, node, state, *args, **kwargs):
+        """
+        Stand-in aware GenericTest.run_and_check_plan.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).run_and_check_plan(
+                node, state, *args, **kwargs)
+        self.execute_cli_createplan_cmd(node)
+        self.execute_cli_runplan_cmd(node)
+        self.assertTrue(self.wait_for_plan_state(node, state))
+
+    def wait_for_cmd(self, node, cmd, expected_rc, timeout_mins=1,
+                     *args, **kwargs):
+        """
+        Stand-in aware GenericTest.wait_for_cmd.
+        """
+        if not standin_enabled():
+            return super(StandinMixin, self).wait_for_cmd(
+                node, cmd, expected_rc, timeout_mins, *args, **kwargs)
+        deadline = time.time() + timeout_mins * 60
+        while get_standin().run(node, cmd)[2] != expected_rc:
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.1)
+        return True
+
+
+def _parse_props(props):
+    """
+    Turns a 'key=value key=value' properties string into a dict.
+    """
+    return _parse_litp_options(["-o"] + shlex.split(props)).get("-o", {})
@@ -0,0 +1,52 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Summary statistics over lists of samples
+"""
+import math
+
+
+def percentile(values, pct):
+    """
+    Description:
+        Nearest rank percentile.
+    Args:
+        values (list): Samples.
+        pct (int): Percentile, 0 to 100.
+    Returns:
+        float. The percentile, 0.0 when there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summary(values):
+    """
+    Description:
+        Count, min, max, mean, p50 and p95 of a list of samples.
+    Args:
+        values (list): Samples.
+    Returns:
+        dict. Statistic name to value, all 0.0 when there are no
+        samples.
+    """
+    if not values:
+        return {"count": 0, "min": 0.0, "max": 0.0, "mean": 0.0,
+                "p50": 0.0, "p95": 0.0}
+
+    return {"count": len(values),
+            "min": min(values),
+            "max": max(values),
+            "mean": sum(values) / float(len(values)),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95)}
@@ -0,0 +1,246 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Waits for ntpstat to report synchronisation on several
+            nodes at the same time
+
+The time each node takes to sync is always recorded and reported. It
+is only asserted against a p95 objective when NTP_SYNC_SLO_P95_SECS is
+set, for example to 120 on deployments whose ntpd servers use iburst.
+"""
+import os
+import time
+import traceback
+from ntp_parallel import run_on_nodes
+from ntp_stats import percentile
+from ntp_timing import RECORDER
+
+NTPSTAT_CMD = "/usr/bin/ntpstat"
+SYNC_SLO_ENV = "NTP_SYNC_SLO_P95_SECS"
+
+
+class NtpSyncResult(object):
+    """
+    Outcome of a wait for synchronisation across several nodes.
+    """
+
+    def __init__(self, sync_times, unsynced, errors=None):
+        """
+        Args:
+            sync_times (dict): Seconds from the start of the wait, or
+                               from the configuration change, until
+                               each converged node reported in sync.
+            unsynced (list): Nodes still not in sync at the deadline.
+            errors (dict): Error that stopped the polling of a node,
+                           per node.
+        """
+        self.sync_times = sync_times
+        self.unsynced = unsynced
+        self.errors = errors or {}
+
+    @property
+    def all_synced(self):
+        """
+        True when every node converged before the deadline.
+        """
+        return not self.unsynced and not self.errors
+
+    def report(self):
+        """
+        Returns:
+            str. One line per node with its time to sync.
+        """
+        lines = []
+        for node in sorted(self.sync_times):
+            lines.append("{0}: in sync after {1:.1f}s".format(
+                node, self.sync_times[node]))
+        for node in self.unsynced:
+            lines.append("{0}: not in sync at deadline".format(node))
+        for node in sorted(self.errors):
+            lines.append("{0}: polling failed: {1}".format(
+                node, self.errors[node]))
+        if self.sync_times:
+            lines.append("time to sync p50 {0:.1f}s p95 {1:.1f}s".format(
+                self.percentile(50), self.percentile(95)))
+
+        return "\n".join(lines)
+
+    def percentile(self, pct):
+        """
+        Description:
+            Time to sync percentile over the nodes that converged.
+        Args:
+            pct (int): Percentile, 0 to 100.
+        Returns:
+            float. Seconds.
+        """
+        return percentile(list(self.sync_times.values()), pct)
+
+    def slo_failures(self, p95_secs=None):
+        """
+        Description:
+            Checks that every node synced before the deadline and, when
+            an objective is set, that the p95 time to sync meets it.
+        Args:
+            p95_secs (float): Highest allowed p95 time to sync, from
+                              NTP_SYNC_SLO_P95_SECS when None. No p95
+                              check is made when neither is set.
+        Returns:
+            list. Messages, empty when the checks pass.
+        """
+        if p95_secs is None:
+            p95_secs = sync_slo_secs()
+        failures = ["{0} never synced".format(node)
+                    for node in self.unsynced]
+        failures += ["{0} could not be polled: {1}".format(
+            node, self.errors[node]) for node in sorted(self.errors)]
+        if p95_secs is not None and self.sync_times and \
+                self.percentile(95) > p95_secs:
+            failures.append("p95 time to sync {0:.1f}s is above {1}s"
+                            .format(self.percentile(95), p95_secs))
+
+        return failures
+
+
+def combine_sync_results(results):
+    """
+    Description:
+        Merges the results of waits on separate nodes.
+    Args:
+        results (list): NtpSyncResult of every wait.
+    Returns:
+        NtpSyncResult. Time to sync and unsynced nodes of all of them.
+    """
+    sync_times = {}
+    unsynced = []
+    errors = {}
+    for result in results:
+        sync_times.update(result.sync_times)
+        unsynced.extend(result.unsynced)
+        errors.update(result.errors)
+
+    return NtpSyncResult(sync_times, unsynced, errors)
+
+
+def sync_slo_secs():
+    """
+    Returns:
+        float. p95 time to sync objective from NTP_SYNC_SLO_P95_SECS,
+        None when it is not set.
+    """
+    value = os.environ.get(SYNC_SLO_ENV, "")
+
+    return float(value) if value else None
+
+
+def wait_for_ntp_sync(test, nodes, timeout_mins, cmd=NTPSTAT_CMD,
+                      initial_interval=5, max_interval=60, backoff=1.5,
+                      since=None, flow=None):
+    """
+    Description:
+        Polls cmd on every node at the same time until it returns 0 on
+        all of them or the shared deadline expires. The poll interval
+        of each node grows by backoff after every unsuccessful attempt,
+        so nodes that are far from sync are not hammered while nodes
+        that are about to converge are noticed quickly. The total wait
+        is that of the slowest node rather than the sum over nodes.
+    Args:
+        test (GenericTest): Test instance used to run the commands.
+        nodes (list): Node filenames to wait on.
+        timeout_mins (int): Shared deadline, in minutes.
+        cmd (str): Command whose exit code 0 means the node is in sync.
+        initial_interval (int): First poll interval, in seconds.
+        max_interval (int): Upper bound on the poll interval.
+        backoff (float): Factor applied to the interval after a miss.
+        since (float): Epoch time of the configuration change. Time to
+                       sync is measured from it rather than from the
+                       start of the wait.
+        flow (Flow): ntp_flow.Flow the wait is a step of. The wait
+                     stops with FlowCancelled when the flow is
+                     cancelled.
+    Returns:
+        NtpSyncResult. Time to sync of each node, the nodes that did not
+        converge and the nodes whose polling raised, whose traceback
+        is logged.
+    """
+    start = time.time()
+    deadline = start + timeout_mins * 60
+    origin = start if since is None else since
+    sleep = time.sleep if flow is None else flow.sleep
+
+    def poll(node):
+        """
+        Polls a single node until it syncs or the deadline passes.
+        """
+        interval = initial_interval
+        while True:
+            if flow is not None:
+                flow.check()
+            exit_code = test.run_command(node, cmd,
+                                         default_asserts=False)[2]
+            now = time.time()
+            if exit_code == 0:
+                return now
+            if now >= deadline:
+                return None
+            sleep(min(interval, deadline - now))
+            interval = min(interval * backoff, max_interval)
+
+    sync_times = {}
+    unsynced = []
+    errors = {}
+    for node, synced_at, exc_info in run_on_nodes(poll, nodes,
+                                                  max_workers=len(nodes)):
+        if exc_info is None and synced_at is not None:
+            sync_times[node] = synced_at - origin
+            RECORDER.record("ntpstat", node, start, synced_at - start, cmd)
+            if since is not None:
+                RECORDER.record("time_to_sync", node, since,
+                                synced_at - since, cmd)
+            continue
+        RECORDER.record("ntpstat", node, start, time.time() - start,
+                        cmd, "error")
+        if exc_info is None:
+            unsynced.append(node)
+        elif flow is None or not flow.cancelled:
+            errors[node] = "{0}: {1}".format(exc_info[0].__name__,
+                                             exc_info[1])
+            test.log("error", "Polling {0} on {1} failed:\n{2}".format(
+                cmd, node, "".join(traceback.format_exception(*exc_info))))
+    if flow is not None:
+        flow.check()
+
+    result = NtpSyncResult(sync_times, unsynced, errors)
+    test.log("info", "ntpstat convergence:\n{0}".format(result.report()))
+
+    return result
+
+
+def measure_time_to_sync(test, nodes, changed_at, timeout_mins,
+                         cmd=NTPSTAT_CMD, flow=None):
+    """
+    Description:
+        Polls ntpstat with a short interval so the time each node takes
+        to sync after a configuration change is measured to within a
+        few seconds, instead of only knowing it synced before a long
+        timeout.
+    Args:
+        test (GenericTest): Test instance used to run the commands.
+        nodes (list): Node filenames to wait on.
+        changed_at (float): Epoch time of the change, usually
+                            PlanTimings.ended.
+        timeout_mins (int): Shared deadline, in minutes.
+        cmd (str): Command whose exit code 0 means the node is in sync.
+        flow (Flow): ntp_flow.Flow the wait is a step of.
+    Returns:
+        NtpSyncResult. Time to sync of each node from changed_at.
+    """
+    return wait_for_ntp_sync(test, nodes, timeout_mins, cmd,
+                             initial_interval=1, max_interval=10,
+                             backoff=1.2, since=changed_at, flow=flow)
@@ -0,0 +1,265 @@
+"""
+COPYRIGHT Ericsson 2019
+The copyright to the computer program(s) herein is the property of
+Ericsson Inc. The programs may be used and/or copied only with written
+permission from Ericsson Inc. or in accordance with the terms and
+conditions stipulated in the agreement/contract under which the
+program(s) have been supplied.
+
+@since:     Oct 2026
+@summary:   Records the wall time of remote commands, CLI calls, plans
+            and waits made by the NTP testsets as JSON lines
+
+By default the records of a session go to ntp_timings.jsonl in the
+working directory, next to the nosetests XML report. The first record
+of the session truncates it, so it only ever holds one run. A file
+named in NTP_TIMING_FILE is only appended to, and an empty one turns
+recording off.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TIMING_FILE_ENV = "NTP_TIMING_FILE"
+DEFAULT_TIMING_FILE = "ntp_timings.jsonl"
+
+
+class TimingRecorder(object):
+    """
+    Appends one JSON object per timed operation to a file. Records are
+    tagged with the id of the running test, the node and the operation
+    type so the file can be grouped by any of them. An empty path
+    disables recording.
+    """
+
+    def __init__(self, path, truncate=False):
+        """
+        Args:
+            path (str): File to append records to.
+            truncate (bool): Empty the file before the first record.
+        """
+        self.path = path
+        self.test_id = None
+        self._truncate = truncate
+        self._lock = threading.Lock()
+
+    def record(self, operation, node, start, duration, detail=None,
+               outcome="ok"):
+        """
+        Description:
+            Writes a single record.
+        Args:
+            operation (str): Operation type, e.g. 'cli' or 'ntpstat'.
+            node (str): Node the operation ran against, if any.
+            start (float): Epoch time the operation started.
+            duration (float): Seconds the operation took.
+            detail (str): Command or other free text.
+            outcome (str): 'ok' or 'error'.
+        """
+        if not self.path:
+            return
+        line = json.dumps({"test": self.test_id,
+                           "operation": operation,
+                           "node": node,
+                           "start": round(start, 3),
+                           "duration": round(duration, 3),
+                           "detail": detail,
+                           "outcome": outcome}, sort_keys=True)
+        with self._lock:
+            with open(self.path, "w" if self._truncate else "a") \
+                    as timing_file:
+                timing_file.write(line + "\n")
+            self._truncate = False
+
+    @contextmanager
+    def timed(self, operation, node=None, detail=None):
+        """
+        Description:
+            Context manager recording the time spent in its block.
+        Args:
+            operation (str): Operation type.
+            node (str): Node the operation runs against, if any.
+            detail (str): Command or other free text.
+        """
+        start = time.time()
+        outcome = "ok"
+        try:
+            yield
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self.record(operation, node, start, time.time() - start,
+                        detail, outcome)
+
+
+def case_name(test_id):
+    """
+    Description:
+        Converts a unittest id to the 'file.py:test_name' form used in
+        ordered_tcs.txt.
+    Args:
+        test_id (str): Id such as 'testset_story220.Story220.test_01'.
+    Returns:
+        str. Case name.
+    """
+    parts = test_id.split(".")
+
+    return "{0}.py:{1}".format(parts[-3], parts[-1])
+
+
+def load_records(path):
+    """
+    Description:
+        Reads the records of a timing file.
+    Args:
+        path (str): JSON lines timing file.
+    Returns:
+        list. Records as dicts, empty if the file does not exist.
+    """
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as timing_file:
+        return [json.loads(line) for line in timing_file if line.strip()]
+
+
+RECORDER = TimingRecorder(
+    os.environ.get(TIMING_FILE_ENV, DEFAULT_TIMING_FILE),
+    truncate=TIMING_FILE_ENV not in os.environ)
+
+
+def timed(operation, node=None, detail=None):
+    """
+    Description:
+        Times a block with the session wide RECORDER.
+    Args:
+        operation (str): Operation type.
+        node (str): Node the operation runs against, if any.
+        detail (str): Command or other free text.
+    """
+    return RECORDER.timed(operation, node, detail)
+
+
+class TimingMixin(object):
+    """
+    Mixin for GenericTest subclasses that times setUp, the whole test
+    and every remote command, CLI call, plan wait and command wait made
+    through GenericTest. ntp_base.NtpGenericTest sets its place among
+    the other mixins.
+    """
+
+    def setUp(self):
+        """
+        Description:
+            Tags records with the test id and times the setUp.
+        """
+        RECORDER.test_id = self.id()
+        self._test_start = time.time()
+        with timed("setup"):
+            super(TimingMixin, self).setUp()
+
+    def tearDown(self):
+        """
+        Description:
+            Times the tearDown and records the duration of the test.
+        """
+        with timed("teardown"):
+            super(TimingMixin, self).tearDown()
+        RECORDER.record("test", None, self._test_start,
+                        time.time() - self._test_start)
+
+    def run_command(self, node, cmd, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.run_command.
+        """
+        with timed("command", node, cmd):
+            return super(TimingMixin, self).run_command(node, cmd, *args,
+                                                        **kwargs)
+
+    def _timed_cli(self, name, node, *args, **kwargs):
+        """
+        Runs a GenericTest execute_cli_*_cmd method under a timer.
+        """
+        with timed("cli", node, name):
+            return getattr(super(TimingMixin, self), name)(node, *args,
+                                                           **kwargs)
+
+    def execute_cli_create_cmd(self, node, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.execute_cli_create_cmd.
+        """
+        return self._timed_cli("execute_cli_create_cmd", node, *args,
+                               **kwargs)
+
+    def execute_cli_inherit_cmd(self, node, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.execute_cli_inherit_cmd.
+        """
+        return self._timed_cli("execute_cli_inherit_cmd", node, *args,
+                               **kwargs)
+
+    def execute_cli_update_cmd(self, node, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.execute_cli_update_cmd.
+        """
+        return self._timed_cli("execute_cli_update_cmd", node, *args,
+                               **kwargs)
+
+    def execute_cli_remove_cmd(self, node, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.execute_cli_remove_cmd.
+        """
+        return self._timed_cli("execute_cli_remove_cmd", node, *args,
+                               **kwargs)
+
+    def execute_cli_createplan_cmd(self, node, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.execute_cli_createplan_cmd.
+        """
+        return self._timed_cli("execute_cli_createplan_cmd", node, *args,
+                               **kwargs)
+
+    def execute_cli_runplan_cmd(self, node, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.execute_cli_runplan_cmd.
+        """
+        return self._timed_cli("execute_cli_runplan_cmd", node, *args,
+                               **kwargs)
+
+    def wait_for_plan_state(self, node, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.wait_for_plan_state.
+        """
+        with timed("plan", node, "wait_for_plan_state"):
+            return super(TimingMixin, self).wait_for_plan_state(
+                node, *args, **kwargs)
+
+    def run_and_check_plan(self, node, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.run_and_check_plan.
+        """
+        with timed("plan", node, "run_and_check_plan"):
+            return super(TimingMixin, self).run_and_check_plan(
+                node, *args, **kwargs)
+
+    def wait_for_cmd(self, node, cmd, *args, **kwargs):
+        """
+        Description:
+            Timed GenericTest.wait_for_cmd. Waits on ntpstat are tagged
+            'ntpstat', other waits 'wait'.
+        """
+        operation = "ntpstat" if cmd.endswith("ntpstat") else "wait"
+        with timed(operation, node, cmd):
+            return super(TimingMixin, self).wait_for_cmd(node, cmd, *args,
+                                                         **kwargs)
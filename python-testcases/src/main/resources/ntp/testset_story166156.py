@@ -10,18 +10,31 @@ program(s) have been supplied.
 @author:    xsteuli
 @summary:   Integration tests for Story: TORF-166156
 """
-from litp_generic_test import GenericTest, attr
+from functools import partial
+from litp_generic_test import attr
+from ntp_base import NtpGenericTest
 from litp_generic_utils import GenericUtils
 from redhat_cmd_utils import RHCmdUtils
-import test_constants
+from ntp_conf_snapshot import NtpConfSnapshot
+from ntp_deployment import get_deployment, peer_scale, SCALE_ENV
+from ntp_flow import run_concurrently
+from ntp_model_builder import ModelBuilder
+from ntp_sync import measure_time_to_sync, combine_sync_results
+from ntp_parallel import format_node_failures
+from ntp_plan_watcher import run_and_watch_plan
+from ntp_responder import external_server
 
 
-class Story166156(GenericTest):
+class Story166156(NtpGenericTest):
     """
     TORF-166156:
     As a LITP user, I want modelled NTP Server configurations to be applied to
     physical peer nodes , so that I can configure the nodes with my preference
     of NTP Servers
+
+    The cases run against every peer node, or the first NTP_PEER_SCALE
+    of them, so the same cases act as a scaling test on large clusters.
+    The first peer node plays the part of node1, the rest that of node2.
     """
 
     def setUp(self):
@@ -40,19 +53,24 @@ class Story166156(GenericTest):
         self.redhat = RHCmdUtils()
         self.gen_utils = GenericUtils()
 
-        self.management_server = self.get_management_node_filename()
-        self.mn_nodes = self.get_managed_node_filenames()
-        self.ms_ip = self.get_node_att(self.management_server, 'ipv4')
+        deployment = get_deployment(self)
+        self.management_server = deployment.ms_node
+        self.mn_nodes = list(deployment.scaled_peer_nodes())
+        self.ms_ip = deployment.ms_ip
+        if len(self.mn_nodes) < max(2, peer_scale()):
+            # unittest does not call tearDown when setUp skips
+            self.tearDown()
+            self.skipTest("Needs at least 2 peer nodes and {0}={1}, the "
+                          "deployment has {2}".format(
+                              SCALE_ENV, peer_scale() or "",
+                              len(deployment.peer_nodes)))
 
         self.node1 = self.mn_nodes[0]
-        self.node2 = self.mn_nodes[1]
-        self.node1_url = \
-            self.get_node_url_from_filename(self.management_server,
-                                            self.node1)
-        self.node2_url = \
-            self.get_node_url_from_filename(self.management_server,
-                                            self.node2)
-        self.node_urls = [self.node1_url, self.node2_url]
+        self.other_nodes = self.mn_nodes[1:]
+        self.node1_url = deployment.node_url(self.node1)
+        self.node_urls = [deployment.node_url(node)
+                          for node in self.mn_nodes]
+        self.other_node_urls = self.node_urls[1:]
 
         self.ntp_stat_cmd = "/usr/bin/ntpstat"
         self.timeout_mins = 3
@@ -70,6 +88,7 @@ class Story166156(GenericTest):
 
         self.expected_list = \
             ["server {0}".format(x) for x in self.ntp_servers]
+        self.ntp_conf = NtpConfSnapshot(self)
 
     def tearDown(self):
         """
@@ -84,6 +103,60 @@ class Story166156(GenericTest):
         """
         super(Story166156, self).tearDown()
 
+    def check_ntp_servers(self, nodes, patterns, expected, exact=False):
+        """
+        Description:
+        Reads /etc/ntp.conf on all the nodes at once and checks the
+        lines matching patterns on each of them. Every failing node is
+        reported in a single assertion.
+        Args:
+            nodes (list): Node filenames to check.
+            patterns (str|list): grep patterns.
+            expected (list): Expected server lines.
+            exact (bool): The matching lines must be exactly expected,
+                          rather than include all of it.
+        """
+        self.ntp_conf.refresh(nodes)
+        failures = []
+        for node in nodes:
+            std_out = self.ntp_conf.grep(node, patterns)
+            if exact:
+                failed = std_out != expected
+            else:
+                failed = not std_out or \
+                    self.gen_utils.compare_lists(expected, std_out)
+            if failed:
+                failures.append((node, "expected {0}, found {1}".format(
+                    expected, std_out)))
+
+        self.assertEqual([], failures, format_node_failures(failures))
+
+    def check_servers_and_sync(self, plan, timeout_mins=30):
+        """
+        Description:
+        Checks the ntp servers of every peer node and waits for it to
+        sync. Each node is one step: its commands run one after another
+        while the nodes are handled at the same time. A node with the
+        wrong servers fails the test and stops the sync wait of the
+        other nodes.
+        Args:
+            plan (PlanTimings): Plan that made the change.
+            timeout_mins (int): Sync timeout, in minutes.
+        """
+        def check_node(node, flow):
+            """
+            Checks ntp.conf of a peer node, then waits for it to sync.
+            """
+            self.check_ntp_servers([node], self.ntp_servers,
+                                   self.expected_list)
+            return measure_time_to_sync(self, [node], plan.ended,
+                                        timeout_mins=timeout_mins,
+                                        flow=flow)
+
+        sync = combine_sync_results(run_concurrently(
+            *[partial(check_node, node) for node in self.mn_nodes]))
+        self.assertEqual([], sync.slo_failures(), sync.report())
+
     @attr('all', 'non-revert', 'story166156', 'story166156_tc01')
     def test_01_p_reconfigure_multiple_ntp_services_runtime(self):
         """
@@ -123,76 +196,49 @@ class Story166156(GenericTest):
         ntp2_service_url = software_items + '/' + ntp2_svc_name
         ntp2_servers_url = ntp2_service_url + '/servers'
 
-        # Create node1 and node2 alias_config
-        self.execute_cli_create_cmd(self.management_server,
-                                    self.node1_url + '/configs/alias_config',
-                                    "alias-node-config", add_to_cleanup=False)
-        self.execute_cli_create_cmd(self.management_server,
-                                    self.node2_url + '/configs/alias_config',
-                                    "alias-node-config", add_to_cleanup=False)
+        model = ModelBuilder(self, self.management_server)
+
+        # Create the alias_config of every peer node
+        for node_url in self.node_urls:
+            model.create(node_url + '/configs/alias_config',
+                         "alias-node-config")
 
-        # Create ntpAlias1 and ntpAlias2 on both peer nodes
+        # Create ntpAlias1 and ntpAlias2 on every peer node
         # ntpAlias1 and ntpAlias2 are external ntp ip addresses present on
         # the Cloud GW (eth2 =>172.16.30.1 ; eth3 => 172.15.29.1)
-        props = "alias_names=ntpAlias1 address=172.16.30.1"
-        self.execute_cli_create_cmd(self.management_server, \
-                self.node1_url + '/configs/alias_config/aliases/ntpAlias1', \
-                "alias", props, add_to_cleanup=False)
-
-        self.execute_cli_create_cmd(self.management_server, \
-                self.node2_url + '/configs/alias_config/aliases/ntpAlias1', \
-                "alias", props, add_to_cleanup=False)
-
-        props = "alias_names=ntpAlias2 address=172.16.29.1"
-        self.execute_cli_create_cmd(self.management_server, \
-                self.node1_url + '/configs/alias_config/aliases/ntpAlias2', \
-                "alias", props, add_to_cleanup=False)
-
-        self.execute_cli_create_cmd(self.management_server, \
-                self.node2_url + '/configs/alias_config/aliases/ntpAlias2', \
-                "alias", props, add_to_cleanup=False)
+        # or at the responder standing in for them when one is configured
+        aliases = [("ntpAlias1", external_server("172.16.30.1")),
+                   ("ntpAlias2", external_server("172.16.29.1"))]
+        for alias_name, address in aliases:
+            props = "alias_names={0} address={1}".format(alias_name, address)
+            for node_url in self.node_urls:
+                model.create(node_url + '/configs/alias_config/aliases/' +
+                             alias_name, "alias", props)
 
         # Create ntp2 service item
-        self.execute_cli_create_cmd(self.management_server, \
-                ntp2_service_url, "ntp-service", add_to_cleanup=False)
+        model.create(ntp2_service_url, "ntp-service")
 
         # Create ntp_1_ip, ntp_2_ip, ntp_3_ip, ntp_4_ip
         # as ntp-servers inside ntp2 service
-        i = 0
-        for server in self.ntp_servers:
-            props = "server={0}".format(server)
-            self.execute_cli_create_cmd(self.management_server, \
-                   ntp2_servers_url + '/server' + str(i + 1), "ntp-server", \
-                   props, add_to_cleanup=False)
-            i += 1
-
-        # inherit ntp2 service on node1 and node2
+        for i, server in enumerate(self.ntp_servers):
+            model.create(ntp2_servers_url + '/server' + str(i + 1),
+                         "ntp-server", "server={0}".format(server))
+
+        # inherit ntp2 service on every peer node
         for node_url in self.node_urls:
-            self.execute_cli_inherit_cmd(self.management_server, \
-                    node_url + '/items/' + ntp2_svc_name, ntp2_service_url, \
-                    add_to_cleanup=False)
-
-        self.run_and_check_plan(self.management_server, \
-                    test_constants.PLAN_COMPLETE, self.timeout_mins)
-
-        for node in self.mn_nodes:
-            # Grep "/etc/ntp.conf" file for the ntp servers list
-            cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file,
-                                                 self.ntp_servers)
-            std_out, std_err, exit_code = self.run_command(node, cmd)
-            self.assertNotEqual([], std_out)
-            self.assertEqual([], std_err)
-            self.assertEqual(0, exit_code)
-
-            # Check ntp_1_ip, ntp_2_ip,_ntp_3,_ip ntp_4_ip
-            # are set as ntp servers
-            self.assertEqual(set(), \
-                (self.gen_utils.compare_lists(self.expected_list, std_out)))
-
-            # Run ntpstat on the peer nodes to ensure ntp re-syncs with the
-            # newly added ntp servers
-            self.assertTrue(self.wait_for_cmd(node, self.ntp_stat_cmd, \
-                                              0, timeout_mins=30))
+            model.inherit(node_url + '/items/' + ntp2_svc_name,
+                          ntp2_service_url)
+
+        # Apply all the model changes in one session on the ms
+        model.apply()
+
+        plan = run_and_watch_plan(self, self.management_server,
+                                  self.timeout_mins)
+
+        # Check ntp_1_ip, ntp_2_ip,_ntp_3,_ip ntp_4_ip are set as ntp
+        # servers on every peer node while running ntpstat on the peer
+        # nodes to ensure ntp re-syncs with the newly added ntp servers
+        self.check_servers_and_sync(plan)
 
     @attr('all', 'non-revert', 'story166156', 'story166156_tc02')
     def test_02_p_remove_multiple_ntp_services_runtime(self):
@@ -224,23 +270,19 @@ class Story166156(GenericTest):
 
         # Remove ntp2 service from software item path
         # Tasks will be created to remove the inherited ntp2
-        # from node1 and node2
+        # from every peer node
         self.execute_cli_remove_cmd(self.management_server, \
                             ntp2_service_url, add_to_cleanup=False)
 
-        self.run_and_check_plan(self.management_server, \
-                        test_constants.PLAN_COMPLETE, self.timeout_mins)
+        run_and_watch_plan(self, self.management_server, self.timeout_mins)
 
         # Check that default configuration is present after ntp2 service was
         # removed. Default ntp server will be the management server ip.
         # Grep "/etc/ntp.conf" file for the default management ip server on
-        # node1 and node2.
-        for node in self.mn_nodes:
-            cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file, self.ms_ip)
-            std_out, std_err, exit_code = self.run_command(node, cmd)
-            self.assertEqual(["server {0}".format(self.ms_ip)], std_out)
-            self.assertEqual([], std_err)
-            self.assertEqual(0, exit_code)
+        # every peer node.
+        self.check_ntp_servers(self.mn_nodes, self.ms_ip,
+                               ["server {0}".format(self.ms_ip)],
+                               exact=True)
 
     @attr('all', 'non-revert', 'story166156', 'story166156_tc03')
     def test_03_p_inherit_ntp_server_set_to_ms_ip(self):
@@ -274,26 +316,21 @@ class Story166156(GenericTest):
 
         # Create ntp2 service having ntp server ip equal with
         # management server ip.
-        self.execute_cli_create_cmd(self.management_server, \
-                ntp2_service_url, "ntp-service", add_to_cleanup=False)
-        self.execute_cli_create_cmd(self.management_server, \
-                ntp2_servers_url + '/server1', "ntp-server", \
-                "server={0}".format(self.ms_ip), add_to_cleanup=False)
-        self.execute_cli_inherit_cmd(self.management_server, \
-                self.node1_url + '/items/' + ntp2_svc_name, ntp2_service_url, \
-                add_to_cleanup=False)
-
-        self.run_and_check_plan(self.management_server, \
-                test_constants.PLAN_COMPLETE, self.timeout_mins)
+        model = ModelBuilder(self, self.management_server)
+        model.create(ntp2_service_url, "ntp-service")
+        model.create(ntp2_servers_url + '/server1', "ntp-server",
+                     "server={0}".format(self.ms_ip))
+        model.inherit(self.node1_url + '/items/' + ntp2_svc_name,
+                      ntp2_service_url)
+        model.apply()
+
+        run_and_watch_plan(self, self.management_server, self.timeout_mins)
 
         # Grep "/etc/ntp.conf" file for the managment server ip on
-        # node1 and node2.
-        for node in self.mn_nodes:
-            cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file, self.ms_ip)
-            std_out, std_err, exit_code = self.run_command(node, cmd)
-            self.assertEqual(["server {0}".format(self.ms_ip)], std_out)
-            self.assertEqual([], std_err)
-            self.assertEqual(0, exit_code)
+        # every peer node.
+        self.check_ntp_servers(self.mn_nodes, self.ms_ip,
+                               ["server {0}".format(self.ms_ip)],
+                               exact=True)
 
     @attr('all', 'non-revert', 'story166156', 'story166156_tc04')
     def test_04_p_inherit_ntp_service_peer_node_when_one_uses_default(self):
@@ -343,33 +380,24 @@ class Story166156(GenericTest):
 
         # Create ntp_2_ip, ntp_3_ip, ntp_4_ip as ntp-servers inside
         # ntp2 ntp-service
-        i = 1
-        for server in self.ntp_servers:
-            props = "server={0}".format(server)
-            self.execute_cli_create_cmd(self.management_server, \
-                   ntp2_servers_url + '/server' + str(i + 1), \
-                   "ntp-server", props, add_to_cleanup=False)
-            i += 1
+        model = ModelBuilder(self, self.management_server)
+        for i, server in enumerate(self.ntp_servers, 1):
+            model.create(ntp2_servers_url + '/server' + str(i + 1),
+                         "ntp-server", "server={0}".format(server))
+        model.apply()
 
-        self.run_and_check_plan(self.management_server, \
-                    test_constants.PLAN_COMPLETE, self.timeout_mins)
+        run_and_watch_plan(self, self.management_server, self.timeout_mins)
 
         # Grep "/etc/ntp.conf" file on node1 to see if it has
         # ntp_1_ip, ntp_2_ip, ntp_3_ip, ntp_4_ip as ntp servers
-        cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file, self.ntp_servers)
-        std_out, std_err, exit_code = self.run_command(self.node1, cmd)
-        self.assertEqual(set(), \
-                (self.gen_utils.compare_lists(self.expected_list, std_out)))
-        self.assertEqual([], std_err)
-        self.assertEqual(0, exit_code)
-
-        # Grep "/etc/ntp.conf" file on node2 to see that it has the
-        # default management server ip as ntp server
-        cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file, self.ms_ip)
-        std_out, std_err, exit_code = self.run_command(self.node2, cmd)
-        self.assertEqual(["server {0}".format(self.ms_ip)], std_out)
-        self.assertEqual([], std_err)
-        self.assertEqual(0, exit_code)
+        self.check_ntp_servers([self.node1], self.ntp_servers,
+                               self.expected_list)
+
+        # Grep "/etc/ntp.conf" file on the other peer nodes to see that
+        # they have the default management server ip as ntp server
+        self.check_ntp_servers(self.other_nodes, self.ms_ip,
+                               ["server {0}".format(self.ms_ip)],
+                               exact=True)
 
     @attr('all', 'non-revert', 'story166156', 'story166156_tc05')
     def test_05_p_inherit_different_ntp_service_with_same_ntp_servers(self):
@@ -411,36 +439,23 @@ class Story166156(GenericTest):
         # Create ntp_1_ip, ntp_2_ip, ntp_3_ip, ntp_4_ip as ntp-servers
         # inside ntp3 ntp-service.
         # ntp2 and ntp3 have the same server list.
-        self.execute_cli_create_cmd(self.management_server, \
-                    ntp3_service_url, 'ntp-service', add_to_cleanup=False)
-        i = 0
-        for server in self.ntp_servers:
-            props = "server={0}".format(server)
-            self.execute_cli_create_cmd(self.management_server, \
-                            ntp3_servers_url + '/server' + str(i + 1), \
-                            "ntp-server", props, add_to_cleanup=False)
-            i += 1
-
-        # Inherit ntp3 ntp service to node2
-        self.execute_cli_inherit_cmd(self.management_server, \
-                self.node2_url + '/items/' + ntp3_svc_name, \
-                ntp3_service_url, add_to_cleanup=False)
-
-        self.run_and_check_plan(self.management_server, \
-                    test_constants.PLAN_COMPLETE, self.timeout_mins)
-
-        # Grep "/etc/ntp.conf" file on both peer nodes to see if it has
+        model = ModelBuilder(self, self.management_server)
+        model.create(ntp3_service_url, 'ntp-service')
+        for i, server in enumerate(self.ntp_servers):
+            model.create(ntp3_servers_url + '/server' + str(i + 1),
+                         "ntp-server", "server={0}".format(server))
+
+        # Inherit ntp3 ntp service to every peer node but node1
+        for node_url in self.other_node_urls:
+            model.inherit(node_url + '/items/' + ntp3_svc_name,
+                          ntp3_service_url)
+        model.apply()
+
+        plan = run_and_watch_plan(self, self.management_server,
+                                  self.timeout_mins)
+
+        # Grep "/etc/ntp.conf" file on every peer node to see if it has
         # the same ntp servers(ntp_1_ip, ntp_2_ip, ntp_3_ip, ntp_4_ip)
-        for node in self.mn_nodes:
-            cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file,
-                                                 self.ntp_servers)
-            std_out, std_err, exit_code = self.run_command(node, cmd)
-            self.assertEqual(set(), \
-                (self.gen_utils.compare_lists(self.expected_list, std_out)))
-            self.assertEqual([], std_err)
-            self.assertEqual(0, exit_code)
-
-            # Run ntpstat on the peer nodes to ensure ntp re-syncs with the
-            # newly added ntp servers
-            self.assertTrue(self.wait_for_cmd(node, self.ntp_stat_cmd, \
-                                              0, timeout_mins=30))
+        # while running ntpstat on the peer nodes to ensure ntp re-syncs
+        # with the newly added ntp servers
+        self.check_servers_and_sync(plan)
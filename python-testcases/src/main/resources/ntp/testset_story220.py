@@ -11,14 +11,21 @@ program(s) have been supplied.
 @summary:   Tests for NTP plugin. Stories:
 LITPCDS-220
 """
-from litp_generic_test import GenericTest, attr
+from litp_generic_test import attr
+from ntp_base import NtpGenericTest
 from redhat_cmd_utils import RHCmdUtils
 from litp_cli_utils import CLIUtils
-import test_constants
-import time
+from ntp_conf_snapshot import NtpConfSnapshot
+from ntp_parallel import format_node_failures
+from ntp_deployment import get_deployment
+from ntp_sync import wait_for_ntp_sync, measure_time_to_sync, \
+    sync_slo_secs
+from ntp_peers import collect_peer_table, STEP_THRESHOLD_MS
+from ntp_plan_watcher import run_and_watch_plan
+from ntp_responder import external_server, RESPONDER_ENV
 
 
-class Story220(GenericTest):
+class Story220(NtpGenericTest):
     """
     LITPCDS-220:
     As an Installer I want the NTP configured on the MS
@@ -39,13 +46,15 @@ class Story220(GenericTest):
         # 1. Call super class setup
         super(Story220, self).setUp()
         self.redhat = RHCmdUtils()
-        self.ms_node = self.get_management_node_filename()
-        self.mn_nodes = self.get_managed_node_filenames()
+        deployment = get_deployment(self)
+        self.ms_node = deployment.ms_node
+        self.mn_nodes = list(deployment.peer_nodes)
         self.ntp_stat_cmd = "/usr/bin/ntpstat"
         self.timeout_mins = 3
         self.cli = CLIUtils()
         self.grep_file = "/etc/ntp.conf"
-        self.ms_ip_address = self.get_node_att(self.ms_node, 'ipv4')
+        self.ms_ip_address = deployment.ms_ip
+        self.ntp_conf = NtpConfSnapshot(self)
 
     def tearDown(self):
         """
@@ -60,15 +69,15 @@ class Story220(GenericTest):
         """
         super(Story220, self).tearDown()
 
-    def ntp_syncs_with_server(self, server, item_to_grep, server_name):
+    def ntp_syncs_with_server(self, server, server_address, server_name):
         """
         Description:
         This method takes in the server and the server name
         Actions:
-        1. Create server(takes arg's of server hostname & item to grep
-        and the server name)
+        1. Create server(takes arg's of server hostname, the address
+        expected in ntp.conf and the server name)
         2. Create and run the plan
-        3. Grep for argument that was passed in
+        3. Check ntp.conf has an uncommented server line for the address
         """
 
         # Step:1 create the ntp server item
@@ -80,38 +89,23 @@ class Story220(GenericTest):
             add_to_cleanup=False)
 
         # Step 2: Create and run the plan
-        # create the plan
-        self.execute_cli_createplan_cmd(self.ms_node)
-        # set a timeout
-        # Perform the run_plan command
-        self.execute_cli_runplan_cmd(self.ms_node)
-        # Wait for plan to complete with success
-        completed_successfully = self.wait_for_plan_state(
-            self.ms_node, test_constants.PLAN_COMPLETE, self.timeout_mins)
-        # ensure plan was successful
-        self.assertTrue(completed_successfully, "Plan was not successful")
+        # create and run the plan, reporting where the time went
+        plan = run_and_watch_plan(self, self.ms_node, self.timeout_mins)
 
-        # Step 3: Check the /etc/ntp.conf for the server
-        # execute grep command
-        cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file, item_to_grep)
-        std_out, std_err, exit_code = self.run_command(self.ms_node, cmd)
-        self.assertNotEqual([], std_out)
-        self.assertEqual([], std_err)
-        self.assertEqual(0, exit_code)
+        # Step 3: Check the /etc/ntp.conf for an uncommented server line
+        self.ntp_conf.refresh([self.ms_node])
+        self.assertTrue(
+            self.ntp_conf.parsed(self.ms_node).has_server(server_address))
 
-        server_found = False
-
-        # Look through all grep lines returned
-        for line in std_out:
-            line_start = line.split(item_to_grep)[0]
-            if "#" not in line_start:
-                server_found = True
-                break
-
-        self.assertTrue(server_found)
-
-        # Step 4: run ntpstat on the ms to ensure ntp re-syncs
-        self.wait_for_cmd(self.ms_node, self.ntp_stat_cmd, 0, timeout_mins=5)
+        # Step 4: run ntpstat on the ms to ensure ntp re-syncs, measuring
+        # how long it takes from the end of the plan
+        sync = measure_time_to_sync(self, [self.ms_node], plan.ended,
+                                    timeout_mins=5)
+        # The wait is only reported, unless a time to sync objective is
+        # set, but ntpstat must have run
+        self.assertEqual({}, sync.errors, sync.report())
+        if sync_slo_secs() is not None:
+            self.assertEqual([], sync.slo_failures(), sync.report())
 
     @attr('all', 'non-revert', 'cdb_priority1')
     def test_01_p_ntp_in_sync(self):
@@ -132,35 +126,43 @@ class Story220(GenericTest):
             @step:  Check the ntp.conf for the uncommented local clock and
             stratum lines
             @result:Local clock and stratum lines is present and uncommented.
+            @step:  Collect the ntpq peer tables of all nodes
+            @result:Every node has reached the ms and its offset is below
+            the step threshold
         @tms_test_precondition:NA
         @tms_execution_type: Automated
         """
         # Step 1: run ntpstat on the ms
         self.assertTrue(self.wait_for_cmd(self.ms_node, self.ntp_stat_cmd, 0,
                                           timeout_mins=20))
-        # Step 2: loop through the nodes
+        # Step 2: read the /etc/ntp.conf of the ms and every node once
+        self.ntp_conf.refresh([self.ms_node] + self.mn_nodes)
         for node in self.mn_nodes:
             # Step 3: check that the ms ip is in the /etc/ntp.conf of each node
             grep_for = "server " + self.ms_ip_address
-            cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file, grep_for)
-            std_out, std_err, exit_code = self.run_command(node, cmd)
-            self.assertNotEqual([], std_out)
-            self.assertEqual([], std_err)
-            self.assertEqual(0, exit_code)
-            # Step 4: run the ntpstat command on each node
-            self.assertTrue(self.wait_for_cmd(node, self.ntp_stat_cmd, 0,
-                                              timeout_mins=40))
+            self.assertNotEqual([], self.ntp_conf.grep(node, grep_for))
+        # Step 4: run the ntpstat command on all nodes at the same time
+        sync = wait_for_ntp_sync(self, self.mn_nodes, timeout_mins=40)
+        self.assertTrue(sync.all_synced, sync.report())
         # Step 5: check ntp.conf file for uncommented local clock and stratum
         # lines
-        lines = ["^server.127.127.1.0.# local clock",
-                 "^fudge.127.127.1.0.stratum 10"]
-        for grep_for in lines:
-            cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file,
-                                                 grep_for, "-E")
-            std_out, std_err, exit_code = self.run_command(self.ms_node, cmd)
-            self.assertNotEqual([], std_out)
-            self.assertEqual([], std_err)
-            self.assertEqual(0, exit_code)
+        ms_ntp_conf = self.ntp_conf.parsed(self.ms_node)
+        local_clock = [entry for entry in ms_ntp_conf.servers()
+                       if entry.address == "127.127.1.0"]
+        self.assertNotEqual([], local_clock)
+        self.assertTrue((local_clock[0].comment or "").startswith(
+            "local clock"))
+        fudge = ms_ntp_conf.fudge("127.127.1.0")
+        self.assertNotEqual(None, fudge)
+        self.assertEqual(["stratum", "10"], fudge.options[:2])
+        # Step 6: check the offset and reach of every node against the ms
+        peers = collect_peer_table(self, self.mn_nodes)
+        to_ms = peers.rows(lambda key: key.remote == self.ms_ip_address)
+        self.assertEqual(len(self.mn_nodes), len(to_ms), peers.report())
+        failures = peers.violations("offset", STEP_THRESHOLD_MS, to_ms)
+        failures += [(peers.keys[row].node, "ms never reached")
+                     for row in to_ms if not peers.columns["reach"][row]]
+        self.assertEqual([], failures, format_node_failures(failures))
 
     @attr('all', 'non-revert')
     def test_02_p_ntp_syncs_loopback(self):
@@ -185,10 +187,10 @@ class Story220(GenericTest):
         # Step 1: Call the ntp sync method
         self.ntp_syncs_with_server(
             server="server='127.127.1.0'",
-            item_to_grep=r"server 127.127.1.0",
+            server_address="127.127.1.0",
             server_name="/server_220_a")
 
-    @attr('all', 'non-revert')
+    @attr('all', 'non-revert', ntp_servers=['1.ie.pool.ntp.org'])
     def test_03_p_syncs_to_external(self):
         """
         @tms_id: litpcds_220_tc03
@@ -209,13 +211,16 @@ class Story220(GenericTest):
         @tms_test_precondition:NA
         @tms_execution_type: Automated
         """
-        # Step 1: Call the ntp sync method
+        # Step 1: Call the ntp sync method, with the responder in place
+        # of the pool server when one is configured
+        server_address = external_server("1.ie.pool.ntp.org")
         self.ntp_syncs_with_server(
-            server="server='1.ie.pool.ntp.org'",
-            item_to_grep=r"server 1.ie.pool.ntp.org",
+            server="server='{0}'".format(server_address),
+            server_address=server_address,
             server_name="/server_220_b")
 
-    @attr('all', 'non-revert')
+    @attr('all', 'non-revert',
+          ntp_servers=['1.ie.pool.ntp.org', '2.ie.pool.ntp.org'])
     def test_04_p_ntp_updates_server(self):
         """
         @tms_id: litpcds_220_tc04
@@ -239,7 +244,12 @@ class Story220(GenericTest):
 
         # Step 1: Setup, create and run the initial plan
         # change the paths and variables needed
-        ntp_external_server = "server='1.ie.pool.ntp.org'"
+        external_server_1 = external_server("1.ie.pool.ntp.org")
+        external_server_2 = external_server("2.ie.pool.ntp.org")
+        if external_server_1 == external_server_2:
+            self.skipTest("Needs two {0} addresses to change the server"
+                          .format(RESPONDER_ENV))
+        ntp_external_server = "server='{0}'".format(external_server_1)
 
         # create the ntp server item
         ntp_server = self.find(self.ms_node, "/software",
@@ -248,47 +258,28 @@ class Story220(GenericTest):
         self.execute_cli_create_cmd(self.ms_node, ntp_server_url, "ntp-server",
                                     ntp_external_server, add_to_cleanup=False)
 
-        # create the plan
-        self.execute_cli_createplan_cmd(self.ms_node)
-        # set a timeout
-        # Perform the run_plan command
-        self.execute_cli_runplan_cmd(self.ms_node)
-        # Wait for plan to complete with success
-        completed_successfully = self.wait_for_plan_state(
-            self.ms_node, test_constants.PLAN_COMPLETE, self.timeout_mins)
-        # ensure plan was successful
-        self.assertTrue(completed_successfully, "Plan was not successful")
+        # create and run the plan, reporting where the time went
+        run_and_watch_plan(self, self.ms_node, self.timeout_mins)
 
         # Step 3: Update the server
         # create the ntp service item
-        ntp_new_server = "server='2.ie.pool.ntp.org'"
+        ntp_new_server = "server='{0}'".format(external_server_2)
         self.execute_cli_update_cmd(
             self.ms_node, ntp_server_url, ntp_new_server)
 
-        # create the plan
-        self.execute_cli_createplan_cmd(self.ms_node)
-        # Perform the run_plan command
-        self.execute_cli_runplan_cmd(self.ms_node)
-        # Wait for plan to complete with success
-        completed_successfully = self.wait_for_plan_state(
-            self.ms_node, test_constants.PLAN_COMPLETE, self.timeout_mins)
-        # ensure plan was successful
-        self.assertTrue(completed_successfully, "Plan was not successful")
+        # create and run the plan, reporting where the time went
+        plan = run_and_watch_plan(self, self.ms_node, self.timeout_mins)
 
-        # wait until the next puppet cycle
+        # Step 4: Wait for the /etc/ntp.conf to contain the new server,
+        # giving up after one puppet cycle
         puppet_cycle = self.get_puppet_interval(self.ms_node)
-        time.sleep(puppet_cycle)
+        self.assertTrue(self.ntp_conf.wait_for(
+            [self.ms_node],
+            lambda ntp_conf: ntp_conf.has_server(external_server_2),
+            timeout_secs=puppet_cycle))
 
-        # Step 4: Check the /etc/ntp.conf for the server
-        grep_for = r"server 2.ie.pool.ntp.org"
-        # execute grep command
-        cmd = RHCmdUtils().get_grep_file_cmd(self.grep_file, grep_for)
-        std_out, std_err, exit_code = self.run_command(self.ms_node, cmd)
-        self.assertNotEqual([], std_out)
-        self.assertEqual([], std_err)
-        self.assertEqual(0, exit_code)
-        # check for the new server
-
-        # Step 5: run ntpstat on the ms
-        self.assertTrue(self.wait_for_cmd(self.ms_node, self.ntp_stat_cmd, 0,
-                                          timeout_mins=5))
+        # Step 5: run ntpstat on the ms, measuring how long it takes to
+        # re-sync from the end of the plan
+        sync = measure_time_to_sync(self, [self.ms_node], plan.ended,
+                                    timeout_mins=5)
+        self.assertEqual([], sync.slo_failures(), sync.report())
@@ -12,11 +12,15 @@ program(s) have been supplied.
             of properties so that they support dual stack with a CIDR
             prefix
 """
-from litp_generic_test import GenericTest, attr
+from litp_generic_test import attr
+from ntp_base import NtpGenericTest
 import test_constants as const
+from ntp_conf_snapshot import NtpConfSnapshot
+from ntp_deployment import get_deployment
+from ntp_parallel import format_node_failures
 
 
-class Story370237(GenericTest):
+class Story370237(NtpGenericTest):
     """
     TORF-370237:
     As a LITP engineer, I need to update a number of properties so
@@ -29,8 +33,9 @@ class Story370237(GenericTest):
         """
         super(Story370237, self).setUp()
 
-        self.ms_node = self.get_management_node_filename()
-        self.peer_nodes = self.get_managed_node_filenames()
+        deployment = get_deployment(self)
+        self.ms_node = deployment.ms_node
+        self.peer_nodes = list(deployment.peer_nodes)
         self.all_nodes = [self.ms_node] + self.peer_nodes
         self.software_items = self.find(self.ms_node, '/software',
                                         'software-item', False)[0]
@@ -51,6 +56,7 @@ class Story370237(GenericTest):
         self.default_peer_nodes_address = "192.168.0.42"
         self.props = "server={0}"
         self.plan_timeout = 5
+        self.ntp_conf = NtpConfSnapshot(self, su_root=True)
 
     def tearDown(self):
         """
@@ -62,7 +68,9 @@ class Story370237(GenericTest):
         """
         Description:
              Checks the /etc/ntp.conf file(s) for a specified IP
-             address on specified nodes
+             address on specified nodes. The file is read from all
+             nodes at once, checked through its parsed server entries
+             and every failing node is reported in a single assertion.
         Args:
             expected_ip_address (str): The expected IP address to be
                                        found in /etc/ntp.conf is
@@ -71,19 +79,23 @@ class Story370237(GenericTest):
             nodes (list): list of nodes to check
         """
 
-        grep_ntp_config_cmd = "{0} {1} {2} | {3} '{{print $2}}' | {0} -v '#'"\
-            .format(const.GREP_PATH, expected_ip_address, const.NTPD_CFG_FILE,
-                    const.AWK_PATH)
-
+        self.ntp_conf.refresh(nodes)
+        failures = []
         for node in nodes:
-            ip_addresses = self.run_command(node, grep_ntp_config_cmd,
-                                        su_root=True, default_asserts=True)[0]
-            self.assertEqual(expected_ip_address, ip_addresses[0],
-                    "Expected IP address {0} is not the same as actual IP "
-                    "address {1}".format(expected_ip_address, ip_addresses[0]))
-            self.assertNotEqual("{0}/{1}".format(expected_ip_address,
-                                                 prefix), ip_addresses[0],
-                        "IPv6 Address with prefix is present in /etc/ntp.conf")
+            ntp_conf = self.ntp_conf.parsed(node)
+            if not ntp_conf.has_server(expected_ip_address):
+                failures.append((node,
+                                 "Expected IP address {0} is not among the "
+                                 "configured servers {1}".format(
+                                     expected_ip_address,
+                                     ntp_conf.server_addresses())))
+            if ntp_conf.has_server("{0}/{1}".format(expected_ip_address,
+                                                    prefix)):
+                failures.append((node,
+                                 "IPv6 Address with prefix is present in "
+                                 "/etc/ntp.conf"))
+
+        self.assertEqual([], failures, format_node_failures(failures))
 
     @attr('all', 'revert', 'story370237', 'story370237_tc01')
     def test_01_p_create_update_remove_ntp_server_ipv6_address(self):
@@ -125,17 +137,17 @@ class Story370237(GenericTest):
 
         self.log("info", "#2. Create ntp-server")
         self.execute_cli_create_cmd(self.ms_node, self.ntp_ipv6_service_url,
-                                    "ntp-service", add_to_cleanup=True)
+                                    "ntp-service", add_to_cleanup=False)
         self.execute_cli_create_cmd(self.ms_node, self.ntp_ipv6_server_url.
                         format(self.ntp_ipv6_service_url, "server-ipv6"),
                         "ntp-server", self.props.format("{0}/{1}".format(
-                self.ipv6_address, self.ipv6_prefix), add_to_cleanup=True))
+                self.ipv6_address, self.ipv6_prefix)), add_to_cleanup=False)
 
         self.log("info", "#3. Inherit ntp-service onto peer nodes")
         for node_url in self.node_urls:
             self.execute_cli_inherit_cmd(self.ms_node, "{0}/items/{1}".format
             (node_url, self.ntp_service_name), self.ntp_ipv6_service_url,
-                                         add_to_cleanup=True)
+                                         add_to_cleanup=False)
         self.run_and_check_plan(self.ms_node, const.PLAN_COMPLETE,
                                 self.plan_timeout)
 
@@ -149,8 +161,7 @@ class Story370237(GenericTest):
         self.execute_cli_update_cmd(self.ms_node, self.ntp_ipv6_server_url
                 .format(self.ntp_ipv6_service_url, "server-ipv6"), self.props
                                     .format("{0}/{1}".format(
-            self.ipv6_address_update, self.ipv6_prefix_update),
-            add_to_cleanup=True))
+            self.ipv6_address_update, self.ipv6_prefix_update)))
         self.run_and_check_plan(self.ms_node, const.PLAN_COMPLETE,
                                 self.plan_timeout)
         self.check_ntp_config(self.ipv6_address_update,